@@ -43,47 +43,49 @@ def main() -> None:
         timeout_seconds=CONFIG["timeout_seconds"],
         max_retries=CONFIG["max_retries"],
         backoff_factor=CONFIG["backoff_factor"],
+        cache_dir=str(ROOT / CONFIG["cache"]["dir"]),
+        metrics_jsonl=str(ROOT / CONFIG["logging"]["metrics_jsonl"]),
+        metrics_prometheus=CONFIG["logging"]["metrics_prometheus"] or None,
     )
-    client = EthicalHttpClient(http_cfg, scrape_logger=scrape_logger)
-
-    source_cfg = CONFIG["sources"]["government"]
-    output_file = ROOT / CONFIG["output"]["government_csv"]
-    output_file.parent.mkdir(parents=True, exist_ok=True)
-
-    try:
-        response = client.get(source_cfg["dataset_csv_url"])
-        response.raise_for_status()
-        df_raw = pd.read_csv(io.StringIO(response.text), dtype=str)
-
-        column_aliases = {
-            "school_name": ["School_name", "school_name"],
-            "suburb": ["Town_suburb", "suburb", "Suburb"],
-            "postcode": ["Postcode", "postcode"],
-            "phone": ["Phone", "phone"],
-            "public_email": ["School_Email", "Email", "email"],
-            "website_url": ["Website", "website"],
-        }
-
-        mapped = {}
-        for target, aliases in column_aliases.items():
-            mapped[target] = None
-            for candidate in aliases:
-                if candidate in df_raw.columns:
-                    mapped[target] = df_raw[candidate]
-                    break
-
-        out = pd.DataFrame(mapped)
-        out["sector"] = "government"
-        out["contact_form_url"] = None
-        out["source_directory_url"] = source_cfg["source_directory_url"]
-        out["last_verified_date"] = date.today().isoformat()
-        out = standardise_dataframe(out)
-        out.to_csv(output_file, index=False)
-
-        print(f"Government schools saved: {len(out)} -> {output_file}")
-    except Exception as exc:
-        error_logger.exception("Government download failed: %s", exc)
-        raise
+    with EthicalHttpClient(http_cfg, scrape_logger=scrape_logger) as client:
+        source_cfg = CONFIG["sources"]["government"]
+        output_file = ROOT / CONFIG["output"]["government_csv"]
+        output_file.parent.mkdir(parents=True, exist_ok=True)
+
+        try:
+            response = client.get(source_cfg["dataset_csv_url"])
+            response.raise_for_status()
+            df_raw = pd.read_csv(io.StringIO(response.text), dtype=str)
+
+            column_aliases = {
+                "school_name": ["School_name", "school_name"],
+                "suburb": ["Town_suburb", "suburb", "Suburb"],
+                "postcode": ["Postcode", "postcode"],
+                "phone": ["Phone", "phone"],
+                "public_email": ["School_Email", "Email", "email"],
+                "website_url": ["Website", "website"],
+            }
+
+            mapped = {}
+            for target, aliases in column_aliases.items():
+                mapped[target] = None
+                for candidate in aliases:
+                    if candidate in df_raw.columns:
+                        mapped[target] = df_raw[candidate]
+                        break
+
+            out = pd.DataFrame(mapped)
+            out["sector"] = "government"
+            out["contact_form_url"] = None
+            out["source_directory_url"] = source_cfg["source_directory_url"]
+            out["last_verified_date"] = date.today().isoformat()
+            out = standardise_dataframe(out)
+            out.to_csv(output_file, index=False)
+
+            print(f"Government schools saved: {len(out)} -> {output_file}")
+        except Exception as exc:
+            error_logger.exception("Government download failed: %s", exc)
+            raise
 
 
 if __name__ == "__main__":
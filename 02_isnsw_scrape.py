@@ -14,12 +14,7 @@ from bs4 import BeautifulSoup
 from tqdm import tqdm
 
 from utils.cleaner import standardise_dataframe
-from utils.extractors import (
-    choose_general_email,
-    extract_contact_form_url,
-    extract_emails_from_text,
-    extract_mailto_emails,
-)
+from utils.extractors import analyse_page, choose_general_email, extract_emails_from_text
 from utils.http_client import EthicalHttpClient, HttpConfig
 
 ROOT = Path(__file__).resolve().parent
@@ -103,14 +98,13 @@ def page_count_from_links(links: list[dict]) -> int:
 
 def enrich_from_homepage(client: EthicalHttpClient, website_url: str) -> tuple[str | None, str | None]:
     try:
-        resp = client.get(website_url)
+        resp = client.get_page(website_url)
         if resp.status_code >= 400:
             return None, None
-        soup = BeautifulSoup(resp.text, "lxml")
-        all_text = soup.get_text("\n", strip=True)
-        emails = extract_mailto_emails(soup) + extract_emails_from_text(all_text)
+        page = analyse_page(resp.text)
+        emails = page.mailto_emails + extract_emails_from_text(page.text)
         email = choose_general_email(emails)
-        form_url = extract_contact_form_url(soup, website_url)
+        form_url = page.contact_form_url(website_url)
         return email, form_url
     except Exception:
         return None, None
@@ -126,80 +120,82 @@ def main() -> None:
         timeout_seconds=min(int(CONFIG["timeout_seconds"]), 10),
         max_retries=1,
         backoff_factor=0.5,
+        cache_dir=str(ROOT / CONFIG["cache"]["dir"]),
+        metrics_jsonl=str(ROOT / CONFIG["logging"]["metrics_jsonl"]),
+        metrics_prometheus=CONFIG["logging"]["metrics_prometheus"] or None,
     )
-    client = EthicalHttpClient(http_cfg, scrape_logger=scrape_logger)
-
-    source_cfg = CONFIG["sources"]["independent"]
-    output_file = ROOT / CONFIG["output"]["independent_csv"]
-    output_file.parent.mkdir(parents=True, exist_ok=True)
-
-    rows = []
-    processed = 0
-
-    for seed_url in source_cfg["directory_urls"]:
-        try:
-            seed_resp = client.get(seed_url)
-            seed_resp.raise_for_status()
-            seed_soup = BeautifulSoup(seed_resp.text, "lxml")
-            app_urls = extract_unifyd_search_urls(seed_soup, seed_url)
-
-            for app_url in app_urls:
-                first = client.get(app_url)
-                first.raise_for_status()
-                first_data = parse_data_page_json(first.text)
-
-                total_pages = page_count_from_links(first_data.get("props", {}).get("links", []))
-                if total_pages < 1:
-                    total_pages = 1
-
-                for page_no in range(1, total_pages + 1):
-                    page_url = f"{app_url}?page={page_no}"
-                    page_resp = first if page_no == 1 else client.get(page_url)
-                    if page_resp.status_code >= 400:
-                        continue
-
-                    page_data = parse_data_page_json(page_resp.text)
-                    listings = page_data.get("props", {}).get("listings", {}).get("data", [])
-
-                    for listing in tqdm(listings, desc=f"ISNSW page {page_no}/{total_pages}"):
-                        addr = listing.get("primaryAddress") or {}
-                        phone_obj = listing.get("primaryPhoneNumber") or {}
-
-                        website_url = ensure_http(listing.get("websiteUrl"))
-                        public_email = choose_general_email([listing.get("emailAddress")])
-                        contact_form_url = None
-
-                        if not public_email and website_url:
-                            homepage_email, homepage_form = enrich_from_homepage(client, website_url)
-                            if homepage_email:
-                                public_email = homepage_email
-                            contact_form_url = homepage_form
-
-                        rows.append(
-                            {
-                                "sector": "independent",
-                                "school_name": listing.get("primaryName"),
-                                "suburb": addr.get("city"),
-                                "postcode": addr.get("postcode"),
-                                "phone": phone_obj.get("raw"),
-                                "public_email": public_email,
-                                "contact_form_url": contact_form_url,
-                                "website_url": website_url,
-                                "source_directory_url": source_cfg["source_directory_url"],
-                                "last_verified_date": date.today().isoformat(),
-                            }
-                        )
-
-                        processed += 1
-                        if processed % 100 == 0:
-                            print(f"Independent processed: {processed}")
-
-        except Exception as exc:
-            error_logger.exception("ISNSW scrape failed (%s): %s", seed_url, exc)
-
-    df = standardise_dataframe(pd.DataFrame(rows))
-    df.to_csv(output_file, index=False)
-    print(f"Independent schools saved: {len(df)} -> {output_file}")
+    with EthicalHttpClient(http_cfg, scrape_logger=scrape_logger) as client:
+        source_cfg = CONFIG["sources"]["independent"]
+        output_file = ROOT / CONFIG["output"]["independent_csv"]
+        output_file.parent.mkdir(parents=True, exist_ok=True)
+
+        rows = []
+        processed = 0
+
+        for seed_url in source_cfg["directory_urls"]:
+            try:
+                seed_resp = client.get(seed_url)
+                seed_resp.raise_for_status()
+                seed_soup = BeautifulSoup(seed_resp.text, "lxml")
+                app_urls = extract_unifyd_search_urls(seed_soup, seed_url)
+
+                for app_url in app_urls:
+                    first = client.get(app_url)
+                    first.raise_for_status()
+                    first_data = parse_data_page_json(first.text)
+
+                    total_pages = page_count_from_links(first_data.get("props", {}).get("links", []))
+                    if total_pages < 1:
+                        total_pages = 1
+
+                    for page_no in range(1, total_pages + 1):
+                        page_url = f"{app_url}?page={page_no}"
+                        page_resp = first if page_no == 1 else client.get(page_url)
+                        if page_resp.status_code >= 400:
+                            continue
+
+                        page_data = parse_data_page_json(page_resp.text)
+                        listings = page_data.get("props", {}).get("listings", {}).get("data", [])
+
+                        for listing in tqdm(listings, desc=f"ISNSW page {page_no}/{total_pages}"):
+                            addr = listing.get("primaryAddress") or {}
+                            phone_obj = listing.get("primaryPhoneNumber") or {}
+
+                            website_url = ensure_http(listing.get("websiteUrl"))
+                            public_email = choose_general_email([listing.get("emailAddress")])
+                            contact_form_url = None
+
+                            if not public_email and website_url:
+                                homepage_email, homepage_form = enrich_from_homepage(client, website_url)
+                                if homepage_email:
+                                    public_email = homepage_email
+                                contact_form_url = homepage_form
+
+                            rows.append(
+                                {
+                                    "sector": "independent",
+                                    "school_name": listing.get("primaryName"),
+                                    "suburb": addr.get("city"),
+                                    "postcode": addr.get("postcode"),
+                                    "phone": phone_obj.get("raw"),
+                                    "public_email": public_email,
+                                    "contact_form_url": contact_form_url,
+                                    "website_url": website_url,
+                                    "source_directory_url": source_cfg["source_directory_url"],
+                                    "last_verified_date": date.today().isoformat(),
+                                }
+                            )
+
+                            processed += 1
+                            if processed % 100 == 0:
+                                print(f"Independent processed: {processed}")
+
+            except Exception as exc:
+                error_logger.exception("ISNSW scrape failed (%s): %s", seed_url, exc)
+
+        df = standardise_dataframe(pd.DataFrame(rows))
+        df.to_csv(output_file, index=False)
+        print(f"Independent schools saved: {len(df)} -> {output_file}")
 
 
 if __name__ == "__main__":
@@ -9,16 +9,10 @@ from urllib.parse import urlencode
 
 import pandas as pd
 import yaml
-from bs4 import BeautifulSoup
 from tqdm import tqdm
 
 from utils.cleaner import standardise_dataframe
-from utils.extractors import (
-    choose_general_email,
-    extract_contact_form_url,
-    extract_emails_from_text,
-    extract_mailto_emails,
-)
+from utils.extractors import analyse_page, choose_general_email, extract_emails_from_text
 from utils.http_client import EthicalHttpClient, HttpConfig
 
 ROOT = Path(__file__).resolve().parent
@@ -123,14 +117,13 @@ def combine_phone(area: str | None, number: str | None) -> str | None:
 
 def enrich_from_homepage(client: EthicalHttpClient, website_url: str) -> tuple[str | None, str | None]:
     try:
-        resp = client.get(website_url)
+        resp = client.get_page(website_url)
         if resp.status_code >= 400:
             return None, None
-        soup = BeautifulSoup(resp.text, "lxml")
-        all_text = soup.get_text("\n", strip=True)
-        emails = extract_mailto_emails(soup) + extract_emails_from_text(all_text)
+        page = analyse_page(resp.text)
+        emails = page.mailto_emails + extract_emails_from_text(page.text)
         email = choose_general_email(emails)
-        form_url = extract_contact_form_url(soup, website_url)
+        form_url = page.contact_form_url(website_url)
         return email, form_url
     except Exception:
         return None, None
@@ -146,68 +139,70 @@ def main() -> None:
         timeout_seconds=min(int(CONFIG["timeout_seconds"]), 10),
         max_retries=1,
         backoff_factor=0.5,
+        cache_dir=str(ROOT / CONFIG["cache"]["dir"]),
+        metrics_jsonl=str(ROOT / CONFIG["logging"]["metrics_jsonl"]),
+        metrics_prometheus=CONFIG["logging"]["metrics_prometheus"] or None,
     )
-    client = EthicalHttpClient(http_cfg, scrape_logger=scrape_logger)
-
-    source_cfg = CONFIG["sources"]["catholic"]
-    output_file = ROOT / CONFIG["output"]["catholic_csv"]
-    output_file.parent.mkdir(parents=True, exist_ok=True)
-
-    rows = []
-    processed = 0
-
-    try:
-        directory_url = source_cfg["directory_urls"][0]
-        directory_resp = client.get(directory_url)
-        directory_resp.raise_for_status()
-        search_path = extract_csnsw_search_path(directory_resp.text)
-        hits = query_catholic_directory(client, search_path)
-
-        for hit in tqdm(hits, desc="Catholic schools"):
-            try:
-                fields = hit.get("fields", {})
-
-                website_url = ensure_http(first_or_none(fields.get("school_url")))
-                public_email = choose_general_email(fields.get("email") or [])
-                contact_form_url = None
-
-                if not public_email and website_url:
-                    homepage_email, homepage_form = enrich_from_homepage(client, website_url)
-                    if homepage_email:
-                        public_email = homepage_email
-                    contact_form_url = homepage_form
-
-                rows.append(
-                    {
-                        "sector": "catholic",
-                        "school_name": first_or_none(fields.get("name")),
-                        "suburb": first_or_none(fields.get("suburb")),
-                        "postcode": first_or_none(fields.get("postcode")),
-                        "phone": combine_phone(
-                            first_or_none(fields.get("phone_area_code")),
-                            first_or_none(fields.get("phone_number")),
-                        ),
-                        "public_email": public_email,
-                        "contact_form_url": contact_form_url,
-                        "website_url": website_url,
-                        "source_directory_url": source_cfg["source_directory_url"],
-                        "last_verified_date": date.today().isoformat(),
-                    }
-                )
-
-                processed += 1
-                if processed % 100 == 0:
-                    print(f"Catholic processed: {processed}")
-
-            except Exception as exc:
-                error_logger.exception("Catholic hit parse failed (%s): %s", hit.get("_id"), exc)
-
-    except Exception as exc:
-        error_logger.exception("Catholic directory failed: %s", exc)
-
-    df = standardise_dataframe(pd.DataFrame(rows))
-    df.to_csv(output_file, index=False)
-    print(f"Catholic schools saved: {len(df)} -> {output_file}")
+    with EthicalHttpClient(http_cfg, scrape_logger=scrape_logger) as client:
+        source_cfg = CONFIG["sources"]["catholic"]
+        output_file = ROOT / CONFIG["output"]["catholic_csv"]
+        output_file.parent.mkdir(parents=True, exist_ok=True)
+
+        rows = []
+        processed = 0
+
+        try:
+            directory_url = source_cfg["directory_urls"][0]
+            directory_resp = client.get(directory_url)
+            directory_resp.raise_for_status()
+            search_path = extract_csnsw_search_path(directory_resp.text)
+            hits = query_catholic_directory(client, search_path)
+
+            for hit in tqdm(hits, desc="Catholic schools"):
+                try:
+                    fields = hit.get("fields", {})
+
+                    website_url = ensure_http(first_or_none(fields.get("school_url")))
+                    public_email = choose_general_email(fields.get("email") or [])
+                    contact_form_url = None
+
+                    if not public_email and website_url:
+                        homepage_email, homepage_form = enrich_from_homepage(client, website_url)
+                        if homepage_email:
+                            public_email = homepage_email
+                        contact_form_url = homepage_form
+
+                    rows.append(
+                        {
+                            "sector": "catholic",
+                            "school_name": first_or_none(fields.get("name")),
+                            "suburb": first_or_none(fields.get("suburb")),
+                            "postcode": first_or_none(fields.get("postcode")),
+                            "phone": combine_phone(
+                                first_or_none(fields.get("phone_area_code")),
+                                first_or_none(fields.get("phone_number")),
+                            ),
+                            "public_email": public_email,
+                            "contact_form_url": contact_form_url,
+                            "website_url": website_url,
+                            "source_directory_url": source_cfg["source_directory_url"],
+                            "last_verified_date": date.today().isoformat(),
+                        }
+                    )
+
+                    processed += 1
+                    if processed % 100 == 0:
+                        print(f"Catholic processed: {processed}")
+
+                except Exception as exc:
+                    error_logger.exception("Catholic hit parse failed (%s): %s", hit.get("_id"), exc)
+
+        except Exception as exc:
+            error_logger.exception("Catholic directory failed: %s", exc)
+
+        df = standardise_dataframe(pd.DataFrame(rows))
+        df.to_csv(output_file, index=False)
+        print(f"Catholic schools saved: {len(df)} -> {output_file}")
 
 
 if __name__ == "__main__":
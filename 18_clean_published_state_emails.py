@@ -2,12 +2,11 @@ from __future__ import annotations
 
 import argparse
 import sqlite3
-from collections import Counter
 from pathlib import Path
 
 import pandas as pd
 
-from utils.extractors import classify_public_email
+from utils.extractors import classify_public_emails
 
 ROOT = Path(__file__).resolve().parent
 
@@ -52,31 +51,22 @@ def clean_state(state: str) -> None:
         print(f"[{state}] skipped (missing public_email column)")
         return
 
-    statuses: list[str] = []
-    reasons: list[str] = []
-    cleaned: list[str] = []
-
-    for _, row in df.iterrows():
-        source_email = str(row.get("public_email") or "").strip()
-        website_url = str(row.get("website_url") or "").strip() or None
-        normalised, status, reason = classify_public_email(source_email, website_url=website_url, source="mixed")
-        statuses.append(status)
-        reasons.append(reason)
-        cleaned.append(normalised if status == "valid" else "")
+    websites = df["website_url"] if "website_url" in df.columns else None
+    result = classify_public_emails(df["public_email"], websites, source="mixed")
 
     before = int((df["public_email"].fillna("").astype(str).str.strip() != "").sum())
-    df["public_email"] = cleaned
+    df["public_email"] = result["email"].where(result["status"] == "valid", "")
     after = int((df["public_email"].fillna("").astype(str).str.strip() != "").sum())
 
     # Keep diagnostics to help audit false positives over time.
-    df["email_validation_status"] = statuses
-    df["email_validation_reason"] = reasons
+    df["email_validation_status"] = result["status"]
+    df["email_validation_reason"] = result["reason"]
 
     df.to_csv(in_csv, index=False)
     if out_sqlite.exists() or state in {"nsw", "vic", "qld", "wa"}:
         save_sqlite(df, out_sqlite)
 
-    status_counts = Counter(statuses)
+    status_counts = result["status"].value_counts()
     print(
         f"[{state}] rows={len(df)} emails_before={before} emails_after={after} "
         f"valid={status_counts.get('valid',0)} suspicious={status_counts.get('suspicious',0)} invalid={status_counts.get('invalid',0)}"
@@ -8,16 +8,17 @@ from urllib.parse import urljoin
 
 import pandas as pd
 import yaml
-from bs4 import BeautifulSoup
 
 from utils.extractors import (
+    PageAnalysis,
+    analyse_page,
     choose_general_email,
+    classification_cache_info,
     classify_public_email,
-    extract_cloudflare_protected_emails,
     extract_emails_from_text,
-    extract_mailto_emails,
 )
 from utils.http_client import EthicalHttpClient, HttpConfig
+from utils.sitemaps import discover_contact_urls
 
 ROOT = Path(__file__).resolve().parent
 CONFIG = yaml.safe_load((ROOT / "config.yml").read_text())
@@ -71,18 +72,17 @@ def clean_text(value: object) -> str:
     return "" if not s or s.lower() == "nan" else s
 
 
-def candidate_contact_urls(soup: BeautifulSoup, base_url: str) -> list[str]:
+def candidate_contact_urls(page: PageAnalysis, base_url: str, sitemap_urls: list[str] | None = None) -> list[str]:
     candidates: list[str] = []
-    for a in soup.select("a[href]"):
-        href = (a.get("href") or "").strip()
-        label = (a.get_text(" ", strip=True) or "").lower()
+    for href, label in page.links:
         if not href:
             continue
         if href.lower().startswith(("mailto:", "javascript:", "tel:")):
             continue
         if "contact" in href.lower() or "contact" in label:
             candidates.append(urljoin(base_url, href))
-    for path in [
+    # Contact pages listed in the sitemap stand in for the blind path guesses.
+    for path in sitemap_urls or [
         "/contact",
         "/contact-us",
         "/contactus",
@@ -103,16 +103,12 @@ def candidate_contact_urls(soup: BeautifulSoup, base_url: str) -> list[str]:
     return out[:8]
 
 
-def extract_strict_email(soup: BeautifulSoup, base_url: str) -> str | None:
-    mailto_emails = extract_mailto_emails(soup)
-    cloudflare_emails = extract_cloudflare_protected_emails(soup)
-    text_emails = extract_emails_from_text(soup.get_text("\n", strip=True))
-
+def extract_strict_email(page: PageAnalysis, base_url: str) -> str | None:
     # High confidence order only.
     email = (
-        choose_general_email(mailto_emails, website_url=base_url, source="mailto")
-        or choose_general_email(cloudflare_emails, website_url=base_url, source="cloudflare")
-        or choose_general_email(text_emails, website_url=base_url, source="text")
+        choose_general_email(page.mailto_emails, website_url=base_url, source="mailto")
+        or choose_general_email(page.cloudflare_emails, website_url=base_url, source="cloudflare")
+        or choose_general_email(extract_emails_from_text(page.text), website_url=base_url, source="text")
     )
     if not email:
         return None
@@ -121,7 +117,9 @@ def extract_strict_email(soup: BeautifulSoup, base_url: str) -> str | None:
     return normalised if status == "valid" else None
 
 
-def recover_state(state: str, max_sites: int, checkpoint_every: int) -> None:
+def recover_state(
+    state: str, max_sites: int, checkpoint_every: int, cache_only: bool = False, replay: bool = False
+) -> None:
     in_csv = STATE_CSV[state]
     if not in_csv.exists():
         print(f"[{state}] missing CSV: {in_csv}")
@@ -142,9 +140,15 @@ def recover_state(state: str, max_sites: int, checkpoint_every: int) -> None:
     http_cfg = HttpConfig(
         user_agent=CONFIG["user_agent"],
         request_delay_seconds=CONFIG["request_delay_seconds"],
-        timeout_seconds=min(int(CONFIG["timeout_seconds"]), 10),
+        timeout_seconds=int(CONFIG["timeout_seconds"]),
+        adaptive_timeouts=True,
         max_retries=1,
         backoff_factor=0.5,
+        cache_dir=str(ROOT / CONFIG["cache"]["dir"]),
+        metrics_jsonl=str(ROOT / CONFIG["logging"]["metrics_jsonl"]),
+        metrics_prometheus=CONFIG["logging"]["metrics_prometheus"] or None,
+        cache_only=cache_only,
+        replay=replay,
     )
     client = EthicalHttpClient(http_cfg, scrape_logger=scrape_logger)
 
@@ -157,7 +161,7 @@ def recover_state(state: str, max_sites: int, checkpoint_every: int) -> None:
             current_email = clean_text(row.get("public_email"))
             checked = str(row.get("recovery_checked") or "").strip().lower() == "true"
 
-            if not website or current_email or checked:
+            if not website or current_email or (checked and not (cache_only or replay)):
                 continue
 
             if max_sites and attempted >= max_sites:
@@ -165,22 +169,21 @@ def recover_state(state: str, max_sites: int, checkpoint_every: int) -> None:
             attempted += 1
 
             try:
-                r = client.get(website)
+                r = client.get_page(website)
                 if r.status_code >= 400:
                     df.at[i, "recovery_checked"] = "true"
                     continue
 
-                soup = BeautifulSoup(r.text, "lxml")
-                email = extract_strict_email(soup, website)
+                page = analyse_page(r.text)
+                email = extract_strict_email(page, website)
 
                 if not email:
-                    for cu in candidate_contact_urls(soup, website):
+                    for cu in candidate_contact_urls(page, website, discover_contact_urls(client, website)):
                         try:
-                            cr = client.get(cu)
+                            cr = client.get_page(cu)
                             if cr.status_code >= 400:
                                 continue
-                            cs = BeautifulSoup(cr.text, "lxml")
-                            email = extract_strict_email(cs, cu)
+                            email = extract_strict_email(analyse_page(cr.text), cu)
                             if email:
                                 break
                         except Exception:
@@ -202,6 +205,7 @@ def recover_state(state: str, max_sites: int, checkpoint_every: int) -> None:
     except KeyboardInterrupt:
         print(f"[{state}] interrupted; saving progress...", flush=True)
     finally:
+        client.close()
         df["last_verified_date"] = date.today().isoformat()
         df.to_csv(in_csv, index=False)
 
@@ -213,6 +217,8 @@ def main() -> None:
     parser.add_argument("--states", nargs="+", default=["nsw", "vic", "qld", "wa"])
     parser.add_argument("--max-sites", type=int, default=0)
     parser.add_argument("--checkpoint-every", type=int, default=100)
+    parser.add_argument("--cache-only", action="store_true", help="Recover from cached responses without network access")
+    parser.add_argument("--replay", action="store_true", help="Recover from the crawl archive instead of the network")
     args = parser.parse_args()
 
     for s in args.states:
@@ -220,7 +226,12 @@ def main() -> None:
         if code not in STATE_CSV:
             print(f"[{code}] skipped (unknown)")
             continue
-        recover_state(code, args.max_sites, args.checkpoint_every)
+        recover_state(
+            code, args.max_sites, args.checkpoint_every, cache_only=args.cache_only, replay=args.replay
+        )
+
+    cache = classification_cache_info()["classify"]
+    print(f"email classification cache: hits={cache.hits} misses={cache.misses}")
 
 
 if __name__ == "__main__":
@@ -19,64 +19,41 @@ from __future__ import annotations
 
 import argparse
 import json
-import re
 from pathlib import Path
 
 import pandas as pd
 
+from utils.extractors import classify_public_emails
+
 ROOT = Path(__file__).resolve().parent
 CSV_PATH = ROOT / "outputs" / "schools_wa_contacts.csv"
 JSON_PATH = ROOT / "docs" / "data" / "wa" / "schools.min.json"
 
-ALLOWED_TLDS = {"au", "com", "org", "net", "edu", "gov", "school", "online"}
-EMAIL_EXACT_RE = re.compile(r"^[A-Z0-9._%+-]+@[A-Z0-9.-]+\.[A-Z]{2,}$", re.IGNORECASE)
-INVISIBLE_CHARS_RE = re.compile(r"[\u200b\u200c\u200d\u2060\ufeff]")
-
-
-def is_valid_email(email: str | None) -> bool:
-    if not email:
-        return False
-    clean = INVISIBLE_CHARS_RE.sub("", str(email)).strip().lower().strip(".,;:!?\"'`()[]{}<>")
-    if not clean or " " in clean or clean.count("@") != 1:
-        return False
-    if not EMAIL_EXACT_RE.match(clean):
-        return False
-    local, domain = clean.split("@", 1)
-    if len(local) < 2:
-        return False
-    if "." not in domain:
-        return False
-    tld = domain.rsplit(".", 1)[-1]
-    if not re.fullmatch(r"[a-z]{2,}", tld):
-        return False
-    return tld in ALLOWED_TLDS
+
+def invalid_emails(emails: pd.Series) -> pd.Series:
+    """True where a non-empty email fails the shared format checks (no website context)."""
+    present = emails.notna() & (emails.fillna("").astype(str).str.strip() != "")
+    return present & (classify_public_emails(emails)["status"] == "invalid")
 
 
 def clean_csv(dry_run: bool) -> int:
     df = pd.read_csv(CSV_PATH, dtype=str)
-    cleared = 0
-    for i, row in df.iterrows():
-        email = str(row.get("public_email") or "").strip()
-        if email and email.lower() != "nan" and not is_valid_email(email):
-            if not dry_run:
-                df.at[i, "public_email"] = None
-                df.at[i, "website_checked"] = "false"
-            cleared += 1
+    bad = invalid_emails(df["public_email"])
     if not dry_run:
+        df.loc[bad, "public_email"] = None
+        df.loc[bad, "website_checked"] = "false"
         df.to_csv(CSV_PATH, index=False)
-    return cleared
+    return int(bad.sum())
 
 
 def clean_json(dry_run: bool) -> int:
     schools = json.loads(JSON_PATH.read_text(encoding="utf-8"))
-    cleared = 0
-    for school in schools:
-        email = school.get("public_email") or ""
-        if email and not is_valid_email(email):
-            if not dry_run:
-                school["public_email"] = ""
-            cleared += 1
+    bad = invalid_emails(pd.Series([school.get("public_email") or "" for school in schools], dtype=object))
+    cleared = int(bad.sum())
     if not dry_run:
+        for school, is_bad in zip(schools, bad):
+            if is_bad:
+                school["public_email"] = ""
         JSON_PATH.write_text(
             json.dumps(schools, separators=(",", ":"), ensure_ascii=True),
             encoding="utf-8",
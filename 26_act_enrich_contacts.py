@@ -2,24 +2,13 @@ from __future__ import annotations
 
 import argparse
 import logging
-import subprocess
-from datetime import date
 from pathlib import Path
-from urllib.parse import urljoin
 
 import pandas as pd
-import requests
 import yaml
-from bs4 import BeautifulSoup
 
-from utils.extractors import (
-    choose_general_email,
-    extract_cloudflare_protected_emails,
-    extract_contact_form_url,
-    extract_emails_from_text,
-    extract_mailto_emails,
-)
-from utils.http_client import EthicalHttpClient, HttpConfig
+from utils.enrichment import add_enrichment_args, enrichment_http_config, run_state_enrichment
+from utils.http_client import EthicalHttpClient
 
 ROOT = Path(__file__).resolve().parent
 CONFIG = yaml.safe_load((ROOT / "config.yml").read_text())
@@ -58,113 +47,9 @@ def ensure_http(url: str | None) -> str | None:
     return "https://" + s
 
 
-def get_with_tls_fallback(
-    client: EthicalHttpClient,
-    url: str,
-    error_logger: logging.Logger,
-) -> tuple[int | None, str | None]:
-    try:
-        resp = client.get(url)
-        return int(resp.status_code), resp.text
-    except requests.exceptions.SSLError as exc:
-        error_logger.error("SSL failed via requests for %s; trying curl fallback: %s", url, exc)
-        try:
-            cmd = [
-                "curl",
-                "-L",
-                "-sS",
-                "--max-time",
-                str(int(CONFIG["timeout_seconds"])),
-                "-A",
-                CONFIG["user_agent"],
-                url,
-            ]
-            result = subprocess.run(cmd, capture_output=True, text=True, check=False)
-            if result.returncode != 0:
-                error_logger.error("curl fallback failed (%s): %s", url, (result.stderr or "").strip())
-                return None, None
-            return 200, result.stdout
-        except Exception as curl_exc:
-            error_logger.error("curl fallback exception (%s): %s", url, curl_exc)
-            return None, None
-
-
-def enrich_from_homepage(client: EthicalHttpClient, website_url: str) -> tuple[str | None, str | None]:
-    def extract_from_soup(soup: BeautifulSoup, base_url: str) -> tuple[str | None, str | None]:
-        all_text = soup.get_text("\n", strip=True)
-        mailto_emails = extract_mailto_emails(soup)
-        cloudflare_emails = extract_cloudflare_protected_emails(soup)
-        text_emails = extract_emails_from_text(all_text)
-        email = (
-            choose_general_email(mailto_emails, website_url=base_url, source="mailto")
-            or choose_general_email(cloudflare_emails, website_url=base_url, source="cloudflare")
-            or choose_general_email(text_emails, website_url=base_url, source="text")
-        )
-        form_url = extract_contact_form_url(soup, base_url)
-        return email, form_url
-
-    def candidate_contact_urls(soup: BeautifulSoup, base_url: str) -> list[str]:
-        candidates: list[str] = []
-        for a in soup.select("a[href]"):
-            href = (a.get("href") or "").strip()
-            label = (a.get_text(" ", strip=True) or "").lower()
-            if not href:
-                continue
-            if "contact" in href.lower() or "contact" in label:
-                candidates.append(urljoin(base_url, href))
-        for path in [
-            "/contact",
-            "/contact-us",
-            "/contactus",
-            "/about/contact",
-            "/about-us/contact",
-            "/enrolments",
-        ]:
-            candidates.append(urljoin(base_url, path))
-
-        seen = set()
-        out = []
-        for u in candidates:
-            key = u.lower().rstrip("/")
-            if key in seen:
-                continue
-            seen.add(key)
-            out.append(u)
-        return out[:8]
-
-    try:
-        status_code, html = get_with_tls_fallback(client, website_url, error_logger=logging.getLogger("errors"))
-        if not html or (status_code is not None and status_code >= 400):
-            return None, None
-        soup = BeautifulSoup(html, "lxml")
-        email, form_url = extract_from_soup(soup, website_url)
-        if email and form_url:
-            return email, form_url
-
-        for cu in candidate_contact_urls(soup, website_url):
-            try:
-                c_status_code, c_html = get_with_tls_fallback(client, cu, error_logger=logging.getLogger("errors"))
-                if not c_html or (c_status_code is not None and c_status_code >= 400):
-                    continue
-                cs = BeautifulSoup(c_html, "lxml")
-                ce, cf = extract_from_soup(cs, cu)
-                if ce and not email:
-                    email = ce
-                if cf and not form_url:
-                    form_url = cf
-                if email and form_url:
-                    break
-            except Exception:
-                continue
-        return email, form_url
-    except Exception:
-        return None, None
-
-
 def main() -> None:
     parser = argparse.ArgumentParser(description="Enrich ACT contacts from official school websites")
-    parser.add_argument("--max-sites", type=int, default=0, help="Optional limit of website rows to process (0=all)")
-    parser.add_argument("--checkpoint-every", type=int, default=50, help="Save CSV every N attempted rows")
+    add_enrichment_args(parser)
     args = parser.parse_args()
 
     scrape_logger, error_logger = build_loggers()
@@ -175,57 +60,9 @@ def main() -> None:
     df["website_checked"] = df["website_checked"].fillna("false").astype(str)
     df["website_url"] = df["website_url"].map(ensure_http)
 
-    http_cfg = HttpConfig(
-        user_agent=CONFIG["user_agent"],
-        request_delay_seconds=CONFIG["request_delay_seconds"],
-        timeout_seconds=min(int(CONFIG["timeout_seconds"]), 10),
-        max_retries=1,
-        backoff_factor=0.5,
-    )
-    client = EthicalHttpClient(http_cfg, scrape_logger=scrape_logger)
-
-    processed = 0
-    attempted = 0
-    try:
-        for i, row in df.iterrows():
-            website = ensure_http(row.get("website_url"))
-            if not website:
-                continue
-            if str(row.get("website_checked") or "").strip().lower() == "true":
-                continue
-            if args.max_sites and attempted >= args.max_sites:
-                break
-            attempted += 1
-
-            existing_email = str(row.get("public_email") or "").strip()
-            existing_form = str(row.get("contact_form_url") or "").strip()
-            try:
-                email, form_url = enrich_from_homepage(client, website)
-                if email and (not existing_email or existing_email.lower() == "nan"):
-                    df.at[i, "public_email"] = email
-                if form_url and (not existing_form or existing_form.lower() == "nan"):
-                    df.at[i, "contact_form_url"] = form_url
-                df.at[i, "website_checked"] = "true"
-                processed += 1
-            except Exception as exc:
-                df.at[i, "website_checked"] = "true"
-                error_logger.exception("ACT website enrichment failed (%s): %s", website, exc)
-
-            if attempted % args.checkpoint_every == 0:
-                df["last_verified_date"] = date.today().isoformat()
-                df.to_csv(OUT_CSV, index=False)
-                print(
-                    f"ACT website enrichment attempted: {attempted}, processed: {processed} (checkpoint saved)",
-                    flush=True,
-                )
-    except KeyboardInterrupt:
-        print("ACT enrichment interrupted; saving progress...", flush=True)
-    finally:
-        df["last_verified_date"] = date.today().isoformat()
-        df.to_csv(OUT_CSV, index=False)
-
-    print(f"ACT website enrichment complete on {processed} rows (attempted {attempted} sites)", flush=True)
-    print(f"Saved: {OUT_CSV}")
+    http_cfg = enrichment_http_config(CONFIG, ROOT, args)
+    with EthicalHttpClient(http_cfg, scrape_logger=scrape_logger) as client:
+        run_state_enrichment("act", df, client, args, OUT_CSV, error_logger)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,88 @@
+from __future__ import annotations
+
+import argparse
+from pathlib import Path
+
+import pandas as pd
+import yaml
+
+from utils.dns_cache import url_hostname
+from utils.http_client import EthicalHttpClient, HttpConfig
+
+ROOT = Path(__file__).resolve().parent
+CONFIG = yaml.safe_load((ROOT / "config.yml").read_text())
+
+STATE_CSV = {
+    "nsw": ROOT / "outputs" / "schools_nsw_contacts.csv",
+    "vic": ROOT / "outputs" / "schools_vic_contacts.csv",
+    "qld": ROOT / "outputs" / "schools_qld_contacts.csv",
+    "wa": ROOT / "outputs" / "schools_wa_contacts.csv",
+    "sa": ROOT / "outputs" / "schools_sa_contacts.csv",
+    "tas": ROOT / "outputs" / "schools_tas_contacts.csv",
+    "act": ROOT / "outputs" / "schools_act_contacts.csv",
+    "nt": ROOT / "outputs" / "schools_nt_contacts.csv",
+}
+
+
+def ensure_http(url: str | None) -> str | None:
+    if not url:
+        return None
+    s = str(url).strip()
+    if not s or s.lower() == "nan":
+        return None
+    if s.startswith("//"):
+        return "https:" + s
+    if s.startswith("http://") or s.startswith("https://"):
+        return s
+    return "https://" + s
+
+
+def load_state_websites(state: str) -> list[str]:
+    in_csv = STATE_CSV[state]
+    if not in_csv.exists():
+        print(f"[{state}] missing CSV: {in_csv}")
+        return []
+    df = pd.read_csv(in_csv, dtype=str)
+    if "website_url" not in df.columns:
+        return []
+    return [u for u in df["website_url"].map(ensure_http) if u]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Pre-warm shared crawl caches for school websites in state CSVs")
+    parser.add_argument("--states", nargs="+", default=list(STATE_CSV))
+    parser.add_argument("--workers", type=int, default=32, help="Hosts to contact in parallel")
+    parser.add_argument("--dns-workers", type=int, default=64, help="Concurrent DNS lookups")
+    args = parser.parse_args()
+
+    http_cfg = HttpConfig(
+        user_agent=CONFIG["user_agent"],
+        request_delay_seconds=CONFIG["request_delay_seconds"],
+        timeout_seconds=min(int(CONFIG["timeout_seconds"]), 10),
+        max_retries=1,
+        backoff_factor=0.5,
+        cache_dir=str(ROOT / CONFIG["cache"]["dir"]),
+        metrics_jsonl=str(ROOT / CONFIG["logging"]["metrics_jsonl"]),
+        metrics_prometheus=CONFIG["logging"]["metrics_prometheus"] or None,
+    )
+    with EthicalHttpClient(http_cfg) as client:
+        for s in args.states:
+            code = s.strip().lower()
+            if code not in STATE_CSV:
+                print(f"[{code}] skipped (unknown)")
+                continue
+            websites = load_state_websites(code)
+            dns = client.resolver.resolve_many(websites, max_workers=args.dns_workers)
+            dead = {host for host, result in dns.items() if result.dead}
+            errors = sum(1 for result in dns.values() if result.status == "error")
+            live = [u for u in websites if url_hostname(u) not in dead]
+            fetched = client.prewarm_robots(live, max_workers=args.workers)
+            print(
+                f"[{code}] websites={len(websites)} hosts={len(dns)} nxdomain={len(dead)} "
+                f"dns_errors={errors} robots_fetched={fetched}",
+                flush=True,
+            )
+
+
+if __name__ == "__main__":
+    main()
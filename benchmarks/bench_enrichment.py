@@ -0,0 +1,132 @@
+"""Crawl-throughput benchmark against the local mock school web.
+
+Drives a state script's homepage enrichment (the same ``enrich`` function and
+``run_enrichment`` pipeline the script uses) over a synthetic corpus and reports
+pages/sec, request latency percentiles and email yield:
+
+    python -m benchmarks.bench_enrichment --schools 300 --state sa
+    python -m benchmarks.bench_enrichment --schools 300 --state wa --slow-fraction 0.2
+"""
+from __future__ import annotations
+
+import argparse
+import importlib
+import json
+import math
+import os
+import tempfile
+import time
+from functools import partial
+from pathlib import Path
+
+from benchmarks.mock_school_web import MockSchoolWeb, build_corpus
+from utils.enrichment import EnrichFunc, enrich_from_homepage, run_enrichment
+from utils.http_client import EthicalHttpClient, HttpConfig
+
+STATE_SCRIPTS = {
+    "vic": "12_vic_enrich_contacts",
+    "qld": "14_qld_enrich_contacts",
+    "wa": "16_wa_enrich_contacts",
+    "sa": "21_sa_enrich_contacts",
+    "tas": "24_tas_enrich_contacts",
+    "act": "26_act_enrich_contacts",
+    "nt": "28_nt_enrich_contacts",
+}
+
+
+def state_enrich(state: str) -> EnrichFunc:
+    """The per-school enrich function the state's script passes to ``run_enrichment``."""
+    module = importlib.import_module(STATE_SCRIPTS[state])
+    if hasattr(module, "enrich_from_homepage"):
+        return module.enrich_from_homepage
+    if hasattr(module, "extract_from_page"):
+        return partial(enrich_from_homepage, extract=module.extract_from_page)
+    return enrich_from_homepage
+
+
+def percentile(values: list[float], q: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, math.ceil(q * len(ordered)) - 1)]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark school-website enrichment against a local mock web")
+    parser.add_argument("--schools", type=int, default=200)
+    parser.add_argument("--state", choices=sorted(STATE_SCRIPTS), default="sa")
+    parser.add_argument("--concurrency", type=int, default=64)
+    parser.add_argument("--port", type=int, default=8800)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--latency-ms", type=float, default=20, help="Response latency of normal hosts")
+    parser.add_argument("--slow-ms", type=float, default=1500, help="Response latency of slow hosts")
+    parser.add_argument("--slow-fraction", type=float, default=0.05)
+    parser.add_argument("--delay", type=float, default=0.1, help="Per-host politeness delay in seconds")
+    parser.add_argument("--timeout", type=int, default=10)
+    parser.add_argument(
+        "--parse-workers", type=int, default=os.cpu_count() or 1, help="Processes for HTML parsing (0 = in the event loop)"
+    )
+    args = parser.parse_args()
+
+    schools = build_corpus(
+        args.schools,
+        args.port,
+        seed=args.seed,
+        latency_ms=args.latency_ms,
+        slow_ms=args.slow_ms,
+        slow_fraction=args.slow_fraction,
+    )
+    enrich = state_enrich(args.state)
+    found: dict[int, str | None] = {}
+
+    def on_result(i: int, website: str, email: str | None, form_url: str | None, exc: Exception | None) -> None:
+        found[i] = email
+
+    with tempfile.TemporaryDirectory() as tmp, MockSchoolWeb(schools, args.port) as web:
+        metrics_path = Path(tmp) / "metrics.jsonl"
+        client = EthicalHttpClient(
+            HttpConfig(
+                user_agent="MockSchoolBenchmark/1.0",
+                request_delay_seconds=args.delay,
+                timeout_seconds=args.timeout,
+                adaptive_timeouts=True,
+                max_retries=0,
+                backoff_factor=0.0,
+                metrics_jsonl=str(metrics_path),
+            )
+        )
+        started = time.monotonic()
+        run_enrichment(
+            client,
+            [(s.index, s.url) for s in schools],
+            on_result,
+            args.concurrency,
+            enrich,
+            parse_workers=args.parse_workers,
+        )
+        elapsed = time.monotonic() - started
+        client.close()
+        served = web.requests_served
+        records = [json.loads(line) for line in metrics_path.read_text().splitlines()]
+
+    ok = [r for r in records if r["status"] is not None and not r["robots_blocked"]]
+    latencies = [r["total_s"] for r in ok]
+    expected = {s.index: s.expected_email for s in schools if s.expected_email}
+    hits = sum(1 for i, email in expected.items() if found.get(i) == email)
+    wrong = sum(1 for s in schools if found.get(s.index) and found.get(s.index) != s.expected_email)
+
+    print(
+        f"state={args.state} schools={len(schools)} concurrency={args.concurrency} "
+        f"parse_workers={args.parse_workers} elapsed={elapsed:.2f}s"
+    )
+    print(f"requests={len(records)} responses={len(ok)} served={served} pages/sec={len(ok) / elapsed:.1f}")
+    print(f"schools/sec={len(schools) / elapsed:.1f}")
+    print(
+        f"latency p50={percentile(latencies, 0.5) * 1000:.0f}ms p95={percentile(latencies, 0.95) * 1000:.0f}ms "
+        f"max={max(latencies, default=0) * 1000:.0f}ms"
+    )
+    print(f"yield={hits}/{len(expected)} ({hits / max(1, len(expected)):.0%}) wrong_emails={wrong}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,222 @@
+"""Extractor throughput benchmark and regression check over a checked-in page corpus.
+
+``benchmarks/extractor_corpus/`` holds anonymised school pages (mailto, Cloudflare
+``data-cfemail``, ``[at]``/``(dot)`` obfuscation, JSON-LD, schoolsonline, a contact form
+and a large page) with their expected extractor outputs in ``expected.json``. The run
+first checks that both the fast markup scan and the lxml parse still produce those
+outputs, then reports pages/sec and peak allocation per page for each extractor:
+
+    python -m benchmarks.bench_extractors
+    python -m benchmarks.bench_extractors --update-baseline
+
+Throughput is also reported relative to a fixed reference workload timed alongside each
+extractor, so a faster or busier machine moves both together. ``extractor_baseline.json``
+holds those relative speeds, and the run exits with status 1 when an output changed or
+a relative speed fell more than ``--max-regression`` below its baseline.
+"""
+from __future__ import annotations
+
+import argparse
+import gc
+import json
+import re
+import statistics
+import sys
+import time
+import tracemalloc
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Callable
+
+from bs4 import BeautifulSoup
+
+from utils.extractors import (
+    PageAnalysis,
+    analyse_page,
+    choose_general_email,
+    clear_classification_cache,
+    extract_contact_form_url,
+    extract_emails_from_text,
+    extract_school_core_fields,
+)
+
+CORPUS_DIR = Path(__file__).with_name("extractor_corpus")
+BASELINE_PATH = Path(__file__).with_name("extractor_baseline.json")
+WORD_RE = re.compile(r"[A-Za-z0-9]+")
+
+
+@dataclass
+class CorpusPage:
+    name: str
+    url: str
+    html: str
+    expected: dict[str, Any]
+    page: PageAnalysis
+
+    @property
+    def candidate_emails(self) -> list[str]:
+        return self.page.mailto_emails + self.page.cloudflare_emails + extract_emails_from_text(self.page.text)
+
+
+def load_corpus() -> list[CorpusPage]:
+    expected = json.loads((CORPUS_DIR / "expected.json").read_text(encoding="utf-8"))
+    pages = []
+    for name, entry in expected.items():
+        html = (CORPUS_DIR / name).read_text(encoding="utf-8")
+        pages.append(CorpusPage(name, entry["url"], html, entry, analyse_page(html)))
+    return pages
+
+
+def outputs(page: PageAnalysis, url: str) -> dict[str, Any]:
+    text_emails = extract_emails_from_text(page.text)
+    return {
+        "mailto_emails": page.mailto_emails,
+        "cloudflare_emails": page.cloudflare_emails,
+        "text_emails": text_emails,
+        "contact_form_url": extract_contact_form_url(page, url),
+        "general_email": choose_general_email(
+            page.mailto_emails + page.cloudflare_emails + text_emails, url, "mailto"
+        ),
+        "core_fields": extract_school_core_fields(page, url),
+    }
+
+
+def check_outputs(pages: list[CorpusPage]) -> list[str]:
+    failures = []
+    for corpus_page in pages:
+        analyses = {
+            "analyse_page": corpus_page.page,
+            "lxml": PageAnalysis.from_soup(BeautifulSoup(corpus_page.html, "lxml")),
+        }
+        for path, page in analyses.items():
+            for key, value in outputs(page, corpus_page.url).items():
+                if value != corpus_page.expected[key]:
+                    failures.append(
+                        f"{corpus_page.name} [{path}] {key}: expected {corpus_page.expected[key]!r}, got {value!r}"
+                    )
+    return failures
+
+
+def reference_workload(page: CorpusPage) -> int:
+    """Regex scanning and plain string work on the page that no extractor change can speed up or slow down."""
+    words = WORD_RE.findall(page.html)
+    return sum(1 for word in words if word.lower() != word) + len(page.html.lower().split("<"))
+
+
+BENCHMARKS: dict[str, Callable[[CorpusPage], Any]] = {
+    "analyse_page": lambda p: analyse_page(p.html),
+    "extract_emails_from_text": lambda p: extract_emails_from_text(p.page.text),
+    "choose_general_email": lambda p: choose_general_email(p.candidate_emails, p.url, "mailto"),
+    "extract_contact_form_url": lambda p: extract_contact_form_url(p.page, p.url),
+    "extract_school_core_fields": lambda p: extract_school_core_fields(p.page, p.url),
+}
+
+
+def corpus_rate(func: Callable[[CorpusPage], Any], pages: list[CorpusPage], min_seconds: float) -> float:
+    """Pages/sec of ``func`` over whole corpus rounds lasting at least ``min_seconds`` of CPU time.
+
+    Classification caches are cleared every round, so each page is classified cold as on a
+    newly crawled site.
+    """
+    done = 0
+    elapsed = 0.0
+    while elapsed < min_seconds:
+        clear_classification_cache()
+        started = time.process_time()
+        for page in pages:
+            func(page)
+        elapsed += time.process_time() - started
+        done += len(pages)
+    return done / elapsed
+
+
+def measure(pages: list[CorpusPage], min_seconds: float, repeat: int) -> tuple[dict[str, float], dict[str, float]]:
+    """Best pages/sec of each extractor, and its median speed relative to the reference workload.
+
+    Each extractor is timed right after the reference in every round, and the garbage
+    collector is off, as in ``timeit``, so a slow spell on a busy machine slows both sides
+    of a ratio rather than one extractor's samples.
+    """
+    rates = dict.fromkeys(BENCHMARKS, 0.0)
+    ratios: dict[str, list[float]] = {name: [] for name in BENCHMARKS}
+    gc.disable()
+    try:
+        for _ in range(repeat):
+            for name, func in BENCHMARKS.items():
+                reference = corpus_rate(reference_workload, pages, min_seconds)
+                rate = corpus_rate(func, pages, min_seconds)
+                rates[name] = max(rates[name], rate)
+                ratios[name].append(rate / reference)
+    finally:
+        gc.enable()
+    return rates, {name: statistics.median(values) for name, values in ratios.items()}
+
+
+def peak_kib_per_page(func: Callable[[CorpusPage], Any], pages: list[CorpusPage]) -> float:
+    clear_classification_cache()
+    tracemalloc.start()
+    try:
+        peaks = []
+        for page in pages:
+            tracemalloc.reset_peak()
+            baseline, _ = tracemalloc.get_traced_memory()
+            func(page)
+            peaks.append(tracemalloc.get_traced_memory()[1] - baseline)
+    finally:
+        tracemalloc.stop()
+    return sum(peaks) / len(peaks) / 1024
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark and regression-check the page extractors")
+    parser.add_argument("--min-seconds", type=float, default=0.05, help="Minimum CPU seconds per repeat")
+    parser.add_argument("--repeat", type=int, default=20, help="Timed repeats per extractor; the best is kept")
+    parser.add_argument(
+        "--max-regression",
+        type=float,
+        default=0.25,
+        help="Fail when a speed relative to the reference falls more than this fraction below the baseline",
+    )
+    parser.add_argument(
+        "--update-baseline", action="store_true", help=f"Write the measured relative speeds to {BASELINE_PATH.name}"
+    )
+    args = parser.parse_args()
+
+    pages = load_corpus()
+    failures = check_outputs(pages)
+    for failure in failures:
+        print(f"OUTPUT CHANGED {failure}")
+    print(f"corpus={len(pages)} pages, {sum(len(p.html) for p in pages) / 1024:.0f} KiB; output mismatches={len(failures)}")
+
+    baseline = json.loads(BASELINE_PATH.read_text(encoding="utf-8")) if BASELINE_PATH.exists() else {}
+    rates, relative = measure(pages, args.min_seconds, args.repeat)
+    regressed = []
+    print(
+        f"{'extractor':<28} {'pages/sec':>11} {'relative':>10} {'baseline':>10} {'change':>8} {'peak KiB/page':>14}"
+    )
+    for name, func in BENCHMARKS.items():
+        peak = peak_kib_per_page(func, pages)
+        expected = baseline.get(name)
+        change = f"{relative[name] / expected - 1:+.0%}" if expected else "-"
+        print(
+            f"{name:<28} {rates[name]:>11.1f} {relative[name]:>10.4f} {expected or 0:>10.4f} {change:>8} {peak:>14.1f}"
+        )
+        if expected and not args.update_baseline and relative[name] < expected * (1 - args.max_regression):
+            regressed.append(name)
+
+    if args.update_baseline:
+        BASELINE_PATH.write_text(
+            json.dumps({name: round(value, 4) for name, value in relative.items()}, indent=2) + "\n",
+            encoding="utf-8",
+        )
+        print(f"baseline written -> {BASELINE_PATH}")
+    elif not baseline:
+        print("no baseline yet; record one with --update-baseline")
+    if regressed:
+        print(f"relative throughput regressed more than {args.max_regression:.0%}: {', '.join(regressed)}")
+    if failures or regressed:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,243 @@
+"""Local stand-in for school websites, for reproducible crawl benchmarks.
+
+Every synthetic school gets its own loopback address (127.1.x.y) so per-host politeness,
+connection pooling and circuit breaking behave as they would against real hosts. Each
+school's address gets its own listening socket (nothing is bound to the wildcard address,
+so the corpus is not reachable from other machines), and one thread accepts on all of
+them; the handler picks the school from the address the client connected to.
+
+Run it standalone to poke at it with a browser or curl:
+
+    python -m benchmarks.mock_school_web --schools 20 --port 8800
+"""
+from __future__ import annotations
+
+import argparse
+import random
+import selectors
+import threading
+import time
+from dataclasses import dataclass
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Optional
+
+# Page layouts in the corpus and their share of schools.
+KIND_WEIGHTS = {
+    "mailto": 0.25,  # mailto link on the homepage
+    "cloudflare": 0.15,  # Cloudflare data-cfemail on the homepage
+    "contact_page": 0.2,  # plain-text email on a linked /contact-us page
+    "sitemap": 0.1,  # email on an unlinked page listed only in sitemap.xml
+    "redirect": 0.05,  # homepage 301s to /home/, which has a mailto link
+    "robots_blocked": 0.05,  # email only on /contact-us, which robots.txt disallows
+    "no_email": 0.1,  # contact form only
+    "tls_fail": 0.05,  # https URL on a plain-HTTP port: the TLS handshake fails
+    "dead": 0.05,  # nothing listening
+}
+# Layouts whose email an ethical crawler should find.
+FINDABLE_KINDS = {"mailto", "cloudflare", "contact_page", "sitemap", "redirect"}
+
+
+@dataclass
+class MockSchool:
+    index: int
+    ip: str
+    kind: str
+    email: Optional[str]
+    latency: float
+    url: str = ""
+
+    @property
+    def name(self) -> str:
+        return f"Mock School {self.index:04d}"
+
+    @property
+    def expected_email(self) -> Optional[str]:
+        return self.email if self.kind in FINDABLE_KINDS else None
+
+
+def school_ip(index: int) -> str:
+    return f"127.1.{index // 250}.{index % 250 + 1}"
+
+
+def build_corpus(
+    count: int,
+    port: int,
+    seed: int = 0,
+    latency_ms: float = 20,
+    slow_ms: float = 1500,
+    slow_fraction: float = 0.05,
+) -> list[MockSchool]:
+    rng = random.Random(seed)
+    kinds = list(KIND_WEIGHTS)
+    weights = list(KIND_WEIGHTS.values())
+    schools = []
+    for i in range(count):
+        kind = rng.choices(kinds, weights)[0]
+        latency = (slow_ms if rng.random() < slow_fraction else latency_ms) / 1000
+        email = None if kind == "no_email" else f"school{i:04d}.ps@education.vic.gov.au"
+        school = MockSchool(index=i, ip=school_ip(i), kind=kind, email=email, latency=latency)
+        if kind == "tls_fail":
+            school.url = f"https://{school.ip}:{port}/"
+        elif kind == "dead":
+            school.url = f"http://{school.ip}:{port + 1}/"
+        else:
+            school.url = f"http://{school.ip}:{port}/"
+        schools.append(school)
+    return schools
+
+
+def cloudflare_encode(email: str, key: int = 0x5A) -> str:
+    return f"{key:02x}" + "".join(f"{ord(c) ^ key:02x}" for c in email)
+
+
+def _page(school: MockSchool, body: str, nav: str = "") -> str:
+    return (
+        f"<!doctype html><html><head><title>{school.name}</title></head><body>"
+        f'<header><nav><a href="/">Home</a> <a href="/about">About</a> <a href="/news">News</a>{nav}</nav></header>'
+        f"<main><h1>{school.name}</h1>{body}</main>"
+        f"<footer><p>{school.index:04d} Example Road, Sampletown VIC 3000</p></footer></body></html>"
+    )
+
+
+def homepage(school: MockSchool) -> str:
+    filler = "<p>Welcome to our learning community.</p>" * 20
+    if school.kind in ("mailto", "redirect"):
+        return _page(school, f'{filler}<p>Email: <a href="mailto:{school.email}">{school.email}</a></p>')
+    if school.kind == "cloudflare":
+        encoded = cloudflare_encode(school.email)
+        return _page(
+            school,
+            f'{filler}<p>Email: <a href="/cdn-cgi/l/email-protection" class="__cf_email__" '
+            f'data-cfemail="{encoded}">[email&#160;protected]</a></p>',
+        )
+    if school.kind in ("contact_page", "robots_blocked"):
+        return _page(school, filler, nav=' <a href="/contact-us">Contact us</a>')
+    if school.kind == "no_email":
+        return _page(school, f'{filler}<form action="/enquiry" method="post"><textarea></textarea></form>')
+    return _page(school, filler)
+
+
+def route(school: MockSchool, path: str) -> tuple[int, str, str, dict[str, str]]:
+    """(status, content type, body, extra headers) for ``path`` on ``school``'s site."""
+    html = "text/html; charset=utf-8"
+    if path == "/robots.txt":
+        if school.kind == "robots_blocked":
+            return 200, "text/plain", "User-agent: *\nDisallow: /contact-us\n", {}
+        if school.kind == "sitemap":
+            return 200, "text/plain", f"User-agent: *\nDisallow:\nSitemap: {school.url}sitemap.xml\n", {}
+        return 404, "text/plain", "not found", {}
+    if path == "/sitemap.xml" and school.kind == "sitemap":
+        urls = ["/", "/about", "/news", "/about-us/contact-the-office"]
+        body = "".join(f"<url><loc>{school.url.rstrip('/')}{u}</loc></url>" for u in urls)
+        xml = f'<?xml version="1.0"?><urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">{body}</urlset>'
+        return 200, "application/xml", xml, {}
+    if path == "/":
+        if school.kind == "redirect":
+            return 301, html, "", {"Location": "/home/"}
+        return 200, html, homepage(school), {}
+    if path == "/home/" and school.kind == "redirect":
+        return 200, html, homepage(school), {}
+    if path in ("/about", "/news"):
+        return 200, html, _page(school, "<p>Nothing to see here.</p>" * 10), {}
+    if path == "/contact-us" and school.kind in ("contact_page", "robots_blocked"):
+        return 200, html, _page(school, f"<p>Phone (03) 9000 0000. Email: {school.email}</p>"), {}
+    if path == "/about-us/contact-the-office" and school.kind == "sitemap":
+        return 200, html, _page(school, f'<p>Email <a href="mailto:{school.email}">the office</a></p>'), {}
+    return 404, html, _page(school, "<p>Page not found.</p>"), {}
+
+
+class MockSchoolHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    schools_by_ip: dict[str, MockSchool] = {}
+    requests_served = 0
+    # Handlers run on the server's per-connection threads.
+    served_lock = threading.Lock()
+
+    def log_message(self, format: str, *args) -> None:
+        pass
+
+    def _respond(self, send_body: bool) -> None:
+        school = self.schools_by_ip.get(self.connection.getsockname()[0])
+        if school is None or not self.client_address[0].startswith("127."):
+            self.send_error(421)
+            return
+        time.sleep(school.latency)
+        with self.served_lock:
+            type(self).requests_served += 1
+        status, content_type, body, headers = route(school, self.path.split("?", 1)[0])
+        payload = body.encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(payload)))
+        for name, value in headers.items():
+            self.send_header(name, value)
+        self.end_headers()
+        if send_body:
+            self.wfile.write(payload)
+
+    def do_GET(self) -> None:
+        self._respond(send_body=True)
+
+    def do_HEAD(self) -> None:
+        self._respond(send_body=False)
+
+
+class MockSchoolWeb:
+    """Serves ``schools`` on their own loopback addresses from a background thread."""
+
+    def __init__(self, schools: list[MockSchool], port: int) -> None:
+        handler = type("Handler", (MockSchoolHandler,), {"schools_by_ip": {s.ip: s for s in schools}})
+        self.servers = []
+        for ip in sorted(handler.schools_by_ip):
+            server = ThreadingHTTPServer((ip, port), handler)
+            server.daemon_threads = True
+            self.servers.append(server)
+        self.handler = handler
+        self._stopped = threading.Event()
+        self._thread = threading.Thread(target=self._serve, daemon=True)
+
+    def _serve(self) -> None:
+        with selectors.DefaultSelector() as selector:
+            for server in self.servers:
+                selector.register(server, selectors.EVENT_READ)
+            while not self._stopped.is_set():
+                for key, _ in selector.select(timeout=0.2):
+                    key.fileobj.handle_request()
+
+    @property
+    def requests_served(self) -> int:
+        return self.handler.requests_served
+
+    def __enter__(self) -> "MockSchoolWeb":
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self._stopped.set()
+        self._thread.join()
+        for server in self.servers:
+            server.server_close()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Serve a synthetic school-website corpus on 127.1.x.y")
+    parser.add_argument("--schools", type=int, default=20)
+    parser.add_argument("--port", type=int, default=8800)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--latency-ms", type=float, default=20)
+    args = parser.parse_args()
+
+    schools = build_corpus(args.schools, args.port, seed=args.seed, latency_ms=args.latency_ms)
+    with MockSchoolWeb(schools, args.port):
+        for school in schools:
+            print(f"{school.url}\t{school.kind}\t{school.expected_email or '-'}")
+        print("Serving; Ctrl+C to stop.", flush=True)
+        try:
+            while True:
+                time.sleep(3600)
+        except KeyboardInterrupt:
+            pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,66 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+import zlib
+from pathlib import Path
+from typing import Any, Optional
+
+
+def body_digest(content: bytes, encoding: Optional[str]) -> str:
+    """Hash of a response body and the charset it is decoded with."""
+    digest = hashlib.sha256((encoding or "").lower().encode("ascii", "replace") + b"\0")
+    digest.update(content)
+    return digest.hexdigest()
+
+
+class AnalysisCache:
+    """SQLite store of page analyses keyed by body hash, for one extractor version.
+
+    CMS boilerplate and error pages served at many URLs, and pages unchanged since the
+    last run, are parsed once. Rows written by other extractor versions are dropped on open.
+    """
+
+    def __init__(self, path: str | Path, version: str) -> None:
+        self.path = Path(path)
+        self.version = version
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(self.path, check_same_thread=False)
+        self._lock = threading.Lock()
+        with self._lock:
+            self._conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS analyses (
+                    digest TEXT PRIMARY KEY,
+                    version TEXT NOT NULL,
+                    record BLOB NOT NULL,
+                    stored_at REAL NOT NULL
+                )
+                """
+            )
+            self._conn.execute("DELETE FROM analyses WHERE version != ?", (version,))
+            self._conn.commit()
+
+    def lookup(self, digest: str) -> Optional[dict[str, Any]]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT record FROM analyses WHERE digest = ? AND version = ?", (digest, self.version)
+            ).fetchone()
+        if row is None:
+            return None
+        return json.loads(zlib.decompress(row[0]))
+
+    def store(self, digest: str, record: dict[str, Any]) -> None:
+        blob = zlib.compress(json.dumps(record, separators=(",", ":")).encode("utf-8"))
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO analyses VALUES (?, ?, ?, ?)", (digest, self.version, blob, time.time())
+            )
+            self._conn.commit()
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
@@ -0,0 +1,183 @@
+from __future__ import annotations
+
+import asyncio
+import multiprocessing
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from functools import partial
+from typing import Any, Awaitable, Callable, Optional
+
+from requests import Response
+
+from utils.analysis_cache import AnalysisCache
+from utils.crawl_metrics import add_rate_limit_wait
+from utils.http_client import EthicalHttpClient, canonical_url, host_key
+
+
+def _after_wait(waited: float, func: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+    # Runs in the worker thread, so the wait is attributed to the request made there.
+    add_rate_limit_wait(waited)
+    return func(*args, **kwargs)
+
+
+def _body_bytes(response: Any) -> int:
+    content = getattr(response, "_content", None)
+    return len(content) if isinstance(content, bytes) else 0
+
+
+def _remember(memo: OrderedDict, key: str, value: Any, size: int, max_bytes: int = 0) -> None:
+    """Keep ``value`` as the newest of at most ``size`` entries and, with ``max_bytes``, at most
+    that many bytes of response bodies (the newest is kept even when larger on its own)."""
+    memo[key] = value
+    memo.move_to_end(key)
+    while len(memo) > size:
+        memo.popitem(last=False)
+    if max_bytes:
+        total = sum(_body_bytes(response) for response in memo.values())
+        while total > max_bytes and len(memo) > 1:
+            total -= _body_bytes(memo.popitem(last=False)[1])
+
+
+class AsyncEthicalHttpClient:
+    """Asyncio front-end for ``EthicalHttpClient``.
+
+    Requests still go through the wrapped client, so robots.txt handling and the
+    per-host token bucket are shared. Each host is fetched by at most one task at a
+    time, tasks wait for the host's next slot without holding a worker, and no more
+    than ``max_concurrency`` requests are in flight overall.
+
+    Pages requested by several schools (shared diocese or department sites) are fetched
+    once per run: concurrent ``get_page`` calls for the same canonical URL share one
+    request, and recent results are kept in a small LRU memo (pages up to ``memo_bytes`` of
+    bodies in all), along with parsed pages
+    (keyed by body hash, so identical pages at different URLs are parsed once). An
+    ``analysis_cache`` carries parsed pages over to later runs.
+
+    With ``parse_workers`` > 0, CPU-bound work passed to ``run_cpu`` (HTML parsing and
+    extraction) runs in that many worker processes instead of on the event loop, so it
+    neither blocks fetching nor contends for the GIL.
+    """
+
+    def __init__(
+        self,
+        client: EthicalHttpClient,
+        max_concurrency: int = 64,
+        memo_size: int = 512,
+        memo_bytes: int = 64 * 1024 * 1024,
+        parse_workers: int = 0,
+        analysis_cache: Optional[AnalysisCache] = None,
+    ) -> None:
+        self.client = client
+        self.analysis_cache = analysis_cache
+        self.max_concurrency = max(1, int(max_concurrency))
+        self.memo_size = max(0, int(memo_size))
+        self.memo_bytes = max(0, int(memo_bytes))
+        self._inflight: dict[tuple[int, str], asyncio.Future] = {}
+        self._pages: OrderedDict[str, Response] = OrderedDict()
+        self._results: OrderedDict[str, Any] = OrderedDict()
+        self._parsed: OrderedDict[str, Any] = OrderedDict()
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._host_locks: dict[str, asyncio.Lock] = {}
+        self._executor = ThreadPoolExecutor(
+            max_workers=self.max_concurrency, thread_name_prefix="ethical-http"
+        )
+        # Spawned rather than forked: the parent already runs request threads.
+        self._parse_pool = (
+            ProcessPoolExecutor(max_workers=parse_workers, mp_context=multiprocessing.get_context("spawn"))
+            if parse_workers > 0
+            else None
+        )
+
+    async def __aenter__(self) -> "AsyncEthicalHttpClient":
+        return self
+
+    async def __aexit__(self, *exc_info: Any) -> None:
+        self.close()
+
+    def close(self) -> None:
+        # Requests already running finish first: the wrapped client's stores are usually closed next.
+        self._executor.shutdown(wait=True, cancel_futures=True)
+        if self._parse_pool is not None:
+            self._parse_pool.shutdown(wait=False, cancel_futures=True)
+
+    def _host_lock(self, host: str) -> asyncio.Lock:
+        lock = self._host_locks.get(host)
+        if lock is None:
+            lock = self._host_locks[host] = asyncio.Lock()
+        return lock
+
+    async def run_blocking(self, func: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, partial(func, *args, **kwargs))
+
+    async def run_cpu(self, func: Callable[..., Any], *args: Any) -> Any:
+        """Run picklable, CPU-bound ``func`` in a parse worker process (inline without any)."""
+        if self._parse_pool is None:
+            return func(*args)
+        return await asyncio.get_running_loop().run_in_executor(self._parse_pool, func, *args)
+
+    async def run_for_host(self, url: str, func: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+        """Run a blocking call that talks to ``url``'s host, holding that host's slot."""
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        host = host_key(url)
+        async with self._host_lock(host):
+            delay = self.client.rate_limiter.ready_in(host)
+            if delay > 0:
+                await asyncio.sleep(delay)
+            async with self._semaphore:
+                return await self.run_blocking(_after_wait, max(delay, 0.0), func, *args, **kwargs)
+
+    async def get(self, url: str, **kwargs: Any) -> Response:
+        return await self.run_for_host(url, self.client.get, url, **kwargs)
+
+    async def head(self, url: str, **kwargs: Any) -> Response:
+        return await self.run_for_host(url, self.client.head, url, **kwargs)
+
+    async def get_page(self, url: str, **kwargs: Any) -> Response:
+        if kwargs:
+            return await self.run_for_host(url, self.client.get_page, url, **kwargs)
+        return await self._once(
+            self._pages,
+            canonical_url(url),
+            lambda: self.run_for_host(url, self.client.get_page, url),
+            max_bytes=self.memo_bytes,
+        )
+
+    async def shared(self, key: str, call: Callable[[], Awaitable[Any]]) -> Any:
+        """Await ``call()`` once per run for ``key``; concurrent and later callers get the same result."""
+        return await self._once(self._results, key, call)
+
+    async def _once(
+        self, memo: OrderedDict, key: str, call: Callable[[], Awaitable[Any]], max_bytes: int = 0
+    ) -> Any:
+        if key in memo:
+            memo.move_to_end(key)
+            return memo[key]
+        inflight_key = (id(memo), key)
+        pending = self._inflight.get(inflight_key)
+        if pending is not None:
+            return await asyncio.shield(pending)
+
+        future = self._inflight[inflight_key] = asyncio.get_running_loop().create_future()
+        try:
+            result = await call()
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except BaseException as exc:
+            future.set_exception(exc)
+            future.exception()  # waiters re-raise it; mark it retrieved for the owner
+            raise
+        finally:
+            self._inflight.pop(inflight_key, None)
+        _remember(memo, key, result, self.memo_size, max_bytes)
+        future.set_result(result)
+        return result
+
+    async def parsed_body(self, digest: str, parse: Callable[[], Awaitable[Any]]) -> Any:
+        """Parsed form of the body hashing to ``digest``, produced by ``parse()`` once per run while memoised."""
+        return await self._once(self._parsed, digest, parse)
+
+    async def is_allowed(self, url: str) -> bool:
+        return await self.run_for_host(url, self.client.is_allowed, url)
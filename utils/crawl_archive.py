@@ -0,0 +1,161 @@
+from __future__ import annotations
+
+import gzip
+import hashlib
+import sqlite3
+import threading
+import uuid
+from datetime import datetime, timezone
+from email.parser import BytesHeaderParser
+from pathlib import Path
+from typing import Optional
+
+import requests
+from requests import Response
+from requests.structures import CaseInsensitiveDict
+from requests.utils import get_encoding_from_headers
+
+from utils.response_cache import WIRE_HEADERS
+
+
+class ArchiveMissError(requests.exceptions.RequestException):
+    """Raised in replay mode when a URL was never archived."""
+
+
+def _http_block(response: Response) -> bytes:
+    status_line = f"HTTP/1.1 {int(response.status_code)} {response.reason or ''}".rstrip()
+    lines = [status_line, f"X-Final-Url: {response.url}"]
+    for name, value in response.headers.items():
+        if name.lower() not in WIRE_HEADERS:
+            lines.append(f"{name}: {value}")
+    lines.append(f"Content-Length: {len(response.content)}")
+    head = "\r\n".join(lines).encode("latin-1", errors="replace")
+    return head + b"\r\n\r\n" + response.content
+
+
+def _response_digest(response: Response) -> str:
+    digest = hashlib.sha256(f"{int(response.status_code)} {response.url or ''}\n".encode("utf-8"))
+    digest.update(response.content or b"")
+    return digest.hexdigest()
+
+
+def _warc_record(url: str, fetched_at: datetime, block: bytes) -> bytes:
+    head = "\r\n".join(
+        [
+            "WARC/1.1",
+            "WARC-Type: response",
+            f"WARC-Record-ID: <urn:uuid:{uuid.uuid4()}>",
+            f"WARC-Date: {fetched_at.strftime('%Y-%m-%dT%H:%M:%SZ')}",
+            f"WARC-Target-URI: {url}",
+            "Content-Type: application/http;msgtype=response",
+            f"Content-Length: {len(block)}",
+        ]
+    ).encode("utf-8")
+    return head + b"\r\n\r\n" + block + b"\r\n\r\n"
+
+
+def _parse_record(record: bytes) -> Response:
+    _, _, rest = record.partition(b"\r\n\r\n")
+    http_head, _, body = rest.partition(b"\r\n\r\n")
+    status_line, _, header_bytes = http_head.partition(b"\r\n")
+    parts = status_line.decode("latin-1").split(" ", 2)
+    headers = CaseInsensitiveDict(BytesHeaderParser().parsebytes(header_bytes).items())
+    length = int(headers.get("Content-Length") or len(body))
+
+    response = Response()
+    response.status_code = int(parts[1])
+    response.reason = parts[2] if len(parts) > 2 else ""
+    response.url = headers.pop("X-Final-Url", "")
+    response.headers = headers
+    response._content = body[:length]
+    response.encoding = get_encoding_from_headers(headers)
+    response.from_archive = True
+    return response
+
+
+class CrawlArchive:
+    """Append-only, gzip-per-record WARC files (one per day) with a SQLite index by URL and date.
+
+    A response identical to the latest one archived for its URL (an unchanged page on a
+    rerun) is not written again.
+    """
+
+    def __init__(self, directory: str | Path) -> None:
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(self.directory / "index.sqlite", check_same_thread=False)
+        self._lock = threading.Lock()
+        with self._lock:
+            self._conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS records (
+                    url TEXT NOT NULL,
+                    fetched_date TEXT NOT NULL,
+                    fetched_at TEXT NOT NULL,
+                    status_code INTEGER NOT NULL,
+                    warc_file TEXT NOT NULL,
+                    offset INTEGER NOT NULL,
+                    length INTEGER NOT NULL,
+                    digest TEXT
+                )
+                """
+            )
+            columns = {row[1] for row in self._conn.execute("PRAGMA table_info(records)")}
+            if "digest" not in columns:
+                self._conn.execute("ALTER TABLE records ADD COLUMN digest TEXT")
+            self._conn.execute("CREATE INDEX IF NOT EXISTS idx_records_url ON records (url, fetched_at)")
+            self._conn.commit()
+
+    def record(self, url: str, response: Response) -> bool:
+        """Archive ``response`` unless it matches the latest record for ``url``; True if written."""
+        digest = _response_digest(response)
+        with self._lock:
+            latest = self._conn.execute(
+                "SELECT digest FROM records WHERE url = ? ORDER BY fetched_at DESC LIMIT 1", (url,)
+            ).fetchone()
+        if latest is not None and latest[0] == digest:
+            return False
+        fetched_at = datetime.now(timezone.utc)
+        payload = gzip.compress(_warc_record(url, fetched_at, _http_block(response)))
+        warc_file = f"crawl-{fetched_at.strftime('%Y%m%d')}.warc.gz"
+        with self._lock:
+            with open(self.directory / warc_file, "ab") as fh:
+                offset = fh.tell()
+                fh.write(payload)
+            self._conn.execute(
+                "INSERT INTO records VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (
+                    url,
+                    fetched_at.date().isoformat(),
+                    fetched_at.isoformat(),
+                    int(response.status_code),
+                    warc_file,
+                    offset,
+                    len(payload),
+                    digest,
+                ),
+            )
+            self._conn.commit()
+        return True
+
+    def lookup(self, url: str, as_of: Optional[str] = None) -> Optional[Response]:
+        """Latest archived response for ``url``, optionally on or before ``as_of`` (YYYY-MM-DD)."""
+        query = "SELECT warc_file, offset, length FROM records WHERE url = ?"
+        params: list = [url]
+        if as_of:
+            query += " AND fetched_date <= ?"
+            params.append(as_of)
+        query += " ORDER BY fetched_at DESC LIMIT 1"
+        with self._lock:
+            row = self._conn.execute(query, params).fetchone()
+        if not row:
+            return None
+        warc_file, offset, length = row
+        with open(self.directory / warc_file, "rb") as fh:
+            fh.seek(offset)
+            payload = fh.read(length)
+        return _parse_record(gzip.decompress(payload))
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
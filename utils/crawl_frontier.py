@@ -0,0 +1,154 @@
+from __future__ import annotations
+
+import sqlite3
+import threading
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Callable, Hashable, Iterable, Mapping, Optional
+
+from utils.host_latency import host_family
+from utils.http_client import EthicalHttpClient, host_key
+
+
+@dataclass
+class FrontierJob:
+    key: int
+    url: str
+    has_email: bool = False
+    checked: bool = False
+
+    @classmethod
+    def from_row(cls, key: Hashable, url: str, row: Mapping[str, Any]) -> "FrontierJob":
+        email = str(row.get("public_email") or "").strip()
+        return cls(
+            key=int(key),
+            url=url,
+            has_email=bool(email) and email.lower() != "nan",
+            checked=str(row.get("website_checked") or "").strip().lower() == "true",
+        )
+
+
+class CrawlBudget:
+    """Stops new work once a wall-clock or request budget is spent (0/None = unlimited)."""
+
+    def __init__(
+        self,
+        client: EthicalHttpClient,
+        minutes: Optional[float] = None,
+        requests: Optional[int] = None,
+    ) -> None:
+        self.client = client
+        self.seconds = minutes * 60 if minutes else None
+        self.requests = requests or None
+        self._started = time.monotonic()
+        self._start_count = client.request_count
+
+    def exhausted(self) -> bool:
+        if self.seconds is not None and time.monotonic() - self._started >= self.seconds:
+            return True
+        return self.requests is not None and self.client.request_count - self._start_count >= self.requests
+
+
+def _yield_keys(host: str) -> list[str]:
+    family = host_family(host)
+    return [host, f"*.{family}"] if family else [host]
+
+
+class CrawlFrontier:
+    """SQLite priority queue of enrichment rows shared by the state scripts.
+
+    Rows without a public email come first, then rows that already have one, then rows
+    checked in an earlier run. Within each tier, hosts (or host families) that yielded
+    emails before are tried first and hosts known to be dead last.
+    """
+
+    def __init__(self, path: str | Path) -> None:
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(self.path, check_same_thread=False)
+        self._lock = threading.Lock()
+        with self._lock:
+            self._conn.executescript(
+                """
+                CREATE TABLE IF NOT EXISTS frontier (
+                    state TEXT NOT NULL,
+                    row_key INTEGER NOT NULL,
+                    url TEXT NOT NULL,
+                    host TEXT NOT NULL,
+                    priority REAL NOT NULL,
+                    status TEXT NOT NULL,
+                    found_email INTEGER,
+                    updated_at REAL NOT NULL,
+                    PRIMARY KEY (state, row_key)
+                );
+                CREATE INDEX IF NOT EXISTS idx_frontier_queue ON frontier (state, status, priority);
+                CREATE TABLE IF NOT EXISTS host_yield (
+                    host TEXT PRIMARY KEY,
+                    attempts INTEGER NOT NULL,
+                    hits INTEGER NOT NULL
+                );
+                """
+            )
+            self._conn.commit()
+
+    def expected_yield(self, host: str) -> float:
+        """Smoothed share of earlier visits to ``host`` (or its family) that found an email."""
+        with self._lock:
+            for key in _yield_keys(host):
+                row = self._conn.execute("SELECT attempts, hits FROM host_yield WHERE host = ?", (key,)).fetchone()
+                if row:
+                    attempts, hits = row
+                    return (hits + 1) / (attempts + 2)
+        return 0.5
+
+    def priority(self, job: FrontierJob, known_dead: bool = False) -> float:
+        tier = 2 if job.checked else 1 if job.has_email else 0
+        return tier + 0.5 * (1 - self.expected_yield(host_key(job.url))) + (0.4 if known_dead else 0.0)
+
+    def plan(
+        self,
+        state: str,
+        jobs: Iterable[FrontierJob],
+        include_checked: bool = False,
+        is_known_dead: Optional[Callable[[str], bool]] = None,
+        limit: int = 0,
+    ) -> list[tuple[int, str]]:
+        """Queue ``jobs`` for ``state`` and return ``(key, url)`` pairs, most valuable first."""
+        now = time.time()
+        rows = []
+        for job in jobs:
+            dead = bool(is_known_dead and is_known_dead(job.url))
+            status = "pending" if include_checked or not job.checked else "skipped"
+            rows.append((state, job.key, job.url, host_key(job.url), self.priority(job, dead), status, now))
+        with self._lock:
+            self._conn.execute("DELETE FROM frontier WHERE state = ?", (state,))
+            self._conn.executemany(
+                "INSERT INTO frontier (state, row_key, url, host, priority, status, updated_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                rows,
+            )
+            self._conn.commit()
+            query = "SELECT row_key, url FROM frontier WHERE state = ? AND status = 'pending' ORDER BY priority, row_key"
+            if limit:
+                query += f" LIMIT {int(limit)}"
+            return [(int(key), url) for key, url in self._conn.execute(query, (state,)).fetchall()]
+
+    def record(self, state: str, key: int, url: str, found_email: bool, update_yield: bool = True) -> None:
+        """Mark a row done; ``update_yield=False`` leaves host yields alone (offline re-extraction)."""
+        with self._lock:
+            self._conn.execute(
+                "UPDATE frontier SET status = 'done', found_email = ?, updated_at = ? WHERE state = ? AND row_key = ?",
+                (int(found_email), time.time(), state, int(key)),
+            )
+            for yield_key in _yield_keys(host_key(url)) if update_yield else ():
+                self._conn.execute(
+                    "INSERT INTO host_yield VALUES (?, 1, ?) "
+                    "ON CONFLICT(host) DO UPDATE SET attempts = attempts + 1, hits = hits + excluded.hits",
+                    (yield_key, int(found_email)),
+                )
+            self._conn.commit()
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
@@ -0,0 +1,178 @@
+from __future__ import annotations
+
+import json
+import os
+import threading
+import time
+from collections import Counter
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Optional
+
+from urllib3.connection import HTTPConnection, HTTPSConnection
+from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+
+# Per-thread timings for the request in flight: TCP/TLS connect time and rate-limiter waits.
+_timing = threading.local()
+
+
+def take_connect_seconds() -> float:
+    seconds = getattr(_timing, "connect", 0.0)
+    _timing.connect = 0.0
+    return seconds
+
+
+def add_rate_limit_wait(seconds: float) -> None:
+    _timing.waited = getattr(_timing, "waited", 0.0) + seconds
+
+
+def take_rate_limit_wait() -> float:
+    seconds = getattr(_timing, "waited", 0.0)
+    _timing.waited = 0.0
+    return seconds
+
+
+class _TimedConnectMixin:
+    def connect(self) -> None:
+        started = time.monotonic()
+        try:
+            super().connect()
+        finally:
+            _timing.connect = getattr(_timing, "connect", 0.0) + time.monotonic() - started
+
+
+class TimedHTTPConnection(_TimedConnectMixin, HTTPConnection):
+    pass
+
+
+class TimedHTTPSConnection(_TimedConnectMixin, HTTPSConnection):
+    pass
+
+
+class TimedHTTPConnectionPool(HTTPConnectionPool):
+    ConnectionCls = TimedHTTPConnection
+
+
+class TimedHTTPSConnectionPool(HTTPSConnectionPool):
+    ConnectionCls = TimedHTTPSConnection
+
+
+TIMED_POOL_CLASSES = {"http": TimedHTTPConnectionPool, "https": TimedHTTPSConnectionPool}
+
+
+@dataclass
+class RequestRecord:
+    ts: float
+    method: str
+    host: str
+    url: str
+    status: Optional[int] = None
+    # Seconds spent opening new connections (0 when a pooled connection was reused).
+    connect_s: float = 0.0
+    # Seconds until response headers arrived (requests' Response.elapsed).
+    ttfb_s: float = 0.0
+    # Seconds from sending the request to having the body in memory.
+    total_s: float = 0.0
+    bytes: int = 0
+    retries: int = 0
+    robots_blocked: bool = False
+    rate_limit_sleep_s: float = 0.0
+    error: Optional[str] = None
+
+
+class CrawlMetrics:
+    """Appends one JSON line per HTTP request and keeps totals for a Prometheus textfile.
+
+    The textfile is rewritten every ``prometheus_every`` requests and by ``close()``.
+    """
+
+    def __init__(
+        self,
+        jsonl_path: Optional[str | Path] = None,
+        prometheus_path: Optional[str | Path] = None,
+        prometheus_every: int = 100,
+    ) -> None:
+        self.jsonl_path = Path(jsonl_path) if jsonl_path else None
+        self.prometheus_path = Path(prometheus_path) if prometheus_path else None
+        self.prometheus_every = max(1, int(prometheus_every))
+        self._lock = threading.Lock()
+        self._fh = None
+        if self.jsonl_path:
+            self.jsonl_path.parent.mkdir(parents=True, exist_ok=True)
+            self._fh = open(self.jsonl_path, "a", encoding="utf-8")
+        self._requests: Counter[str] = Counter()
+        self._totals: Counter[str] = Counter()
+        self._stages: Counter[str] = Counter()
+        self._stage_counts: Counter[str] = Counter()
+        self._since_write = 0
+
+    def record(self, rec: RequestRecord) -> None:
+        line = json.dumps(asdict(rec), separators=(",", ":"))
+        status = "blocked" if rec.robots_blocked else "error" if rec.status is None else f"{rec.status // 100}xx"
+        with self._lock:
+            if self._fh:
+                self._fh.write(line + "\n")
+                self._fh.flush()
+            self._requests[status] += 1
+            self._totals["bytes"] += rec.bytes
+            self._totals["retries"] += rec.retries
+            self._totals["connect_seconds"] += rec.connect_s
+            self._totals["ttfb_seconds"] += rec.ttfb_s
+            self._totals["request_seconds"] += rec.total_s
+            self._totals["rate_limit_sleep_seconds"] += rec.rate_limit_sleep_s
+            self._since_write += 1
+            due = self.prometheus_path is not None and self._since_write >= self.prometheus_every
+        if due:
+            self.write_prometheus()
+
+    def observe_stage(self, stage: str, seconds: float) -> None:
+        """Time spent outside HTTP, e.g. HTML parsing, so it can be compared with network time."""
+        with self._lock:
+            self._stages[stage] += seconds
+            self._stage_counts[stage] += 1
+
+    def prometheus_text(self) -> str:
+        with self._lock:
+            requests = dict(self._requests)
+            totals = dict(self._totals)
+            stages = dict(self._stages)
+            stage_counts = dict(self._stage_counts)
+        lines = [
+            "# HELP crawl_http_requests_total HTTP requests by outcome (status class, error, robots-blocked).",
+            "# TYPE crawl_http_requests_total counter",
+        ]
+        lines += [f'crawl_http_requests_total{{outcome="{k}"}} {v}' for k, v in sorted(requests.items())]
+        for name in (
+            "bytes",
+            "retries",
+            "connect_seconds",
+            "ttfb_seconds",
+            "request_seconds",
+            "rate_limit_sleep_seconds",
+        ):
+            lines.append(f"# TYPE crawl_http_{name}_total counter")
+            lines.append(f"crawl_http_{name}_total {totals.get(name, 0)}")
+        if stages:
+            lines.append("# TYPE crawl_stage_seconds_total counter")
+            lines += [f'crawl_stage_seconds_total{{stage="{k}"}} {v}' for k, v in sorted(stages.items())]
+            lines.append("# TYPE crawl_stage_runs_total counter")
+            lines += [f'crawl_stage_runs_total{{stage="{k}"}} {v}' for k, v in sorted(stage_counts.items())]
+        return "\n".join(lines) + "\n"
+
+    def write_prometheus(self) -> None:
+        if not self.prometheus_path:
+            return
+        self.prometheus_path.parent.mkdir(parents=True, exist_ok=True)
+        # Write-then-rename so the textfile collector never reads a partial file.
+        tmp = self.prometheus_path.with_suffix(self.prometheus_path.suffix + ".tmp")
+        tmp.write_text(self.prometheus_text(), encoding="utf-8")
+        os.replace(tmp, self.prometheus_path)
+        with self._lock:
+            self._since_write = 0
+
+    def close(self) -> None:
+        self.write_prometheus()
+        with self._lock:
+            if self._fh:
+                self._fh.close()
+                self._fh = None
@@ -0,0 +1,94 @@
+from __future__ import annotations
+
+import json
+import socket
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Iterable, Optional
+from urllib.parse import urlparse
+
+from utils.host_state import HostStateStore
+
+# getaddrinfo answers that mean the name will not resolve however often we retry.
+DEAD_GAI_ERRORS = {
+    getattr(socket, name) for name in ("EAI_NONAME", "EAI_NODATA", "EAI_ADDRFAMILY") if hasattr(socket, name)
+}
+
+
+@dataclass
+class DnsResult:
+    host: str
+    status: str  # "ok", "nxdomain" or "error"
+    addresses: list[str] = field(default_factory=list)
+    expires_at: float = 0.0
+
+    @property
+    def fresh(self) -> bool:
+        return time.time() < self.expires_at
+
+    @property
+    def dead(self) -> bool:
+        return self.status == "nxdomain"
+
+
+def url_hostname(url: str) -> Optional[str]:
+    try:
+        return (urlparse(url).hostname or "").lower() or None
+    except ValueError:
+        return None
+
+
+class HostResolver:
+    """Resolves school hostnames in bulk and remembers the answers in the host-state store."""
+
+    def __init__(
+        self,
+        store: Optional[HostStateStore] = None,
+        ok_ttl_seconds: float = 6 * 3600,
+        nxdomain_ttl_seconds: float = 24 * 3600,
+        error_ttl_seconds: float = 3600,
+    ) -> None:
+        self.store = store
+        self.ttls = {"ok": ok_ttl_seconds, "nxdomain": nxdomain_ttl_seconds, "error": error_ttl_seconds}
+        self._results: dict[str, DnsResult] = {}
+        if store:
+            for host, (value, _) in store.items("dns").items():
+                data = json.loads(value)
+                self._results[host] = DnsResult(host=host, **data)
+
+    def cached(self, host: str) -> Optional[DnsResult]:
+        result = self._results.get(host)
+        return result if result is not None and result.fresh else None
+
+    def is_dead(self, host: str) -> bool:
+        result = self.cached(host)
+        return bool(result and result.dead)
+
+    def resolve(self, host: str) -> DnsResult:
+        result = self.cached(host)
+        if result is not None:
+            return result
+        try:
+            infos = socket.getaddrinfo(host, None, proto=socket.IPPROTO_TCP)
+            status, addresses = "ok", sorted({info[4][0] for info in infos})
+        except socket.gaierror as exc:
+            status, addresses = ("nxdomain" if exc.errno in DEAD_GAI_ERRORS else "error"), []
+        except (UnicodeError, OSError):
+            status, addresses = "error", []
+        result = DnsResult(
+            host=host, status=status, addresses=addresses, expires_at=time.time() + self.ttls[status]
+        )
+        self._results[host] = result
+        if self.store:
+            self.store.set(
+                host,
+                "dns",
+                json.dumps({"status": result.status, "addresses": result.addresses, "expires_at": result.expires_at}),
+            )
+        return result
+
+    def resolve_many(self, urls: Iterable[str], max_workers: int = 64) -> dict[str, DnsResult]:
+        hosts = list(dict.fromkeys(h for h in (url_hostname(u) for u in urls if u) if h))
+        with ThreadPoolExecutor(max_workers=max(1, max_workers)) as pool:
+            return dict(zip(hosts, pool.map(self.resolve, hosts)))
@@ -0,0 +1,520 @@
+from __future__ import annotations
+
+import argparse
+import asyncio
+import logging
+import os
+import time
+from datetime import date
+from pathlib import Path
+from typing import AsyncIterator, Awaitable, Callable, Hashable, Iterable, Optional
+from urllib.parse import urljoin
+
+import pandas as pd
+import requests
+
+from utils.analysis_cache import AnalysisCache, body_digest
+from utils.async_http_client import AsyncEthicalHttpClient
+from utils.crawl_frontier import CrawlBudget, CrawlFrontier, FrontierJob
+from utils.extractors import (
+    EXTRACTOR_VERSION,
+    PageAnalysis,
+    analyse_body,
+    choose_general_email,
+    extract_emails_from_text,
+)
+from utils.http_client import EthicalHttpClient, HttpConfig, UnsupportedContentError, host_key
+from utils.site_templates import match_site_template
+from utils.sitemaps import discover_contact_urls
+
+CONTACT_PATH_GUESSES = (
+    "/contact",
+    "/contact-us",
+    "/contactus",
+    "/about/contact",
+    "/about-us/contact",
+    "/enrolments",
+)
+MAX_CONTACT_PAGES = 8
+# Probe answers that mean a guessed path does not exist on the host.
+MISSING_STATUSES = (404, 410)
+# Substrings of the generator meta tag or asset URLs that identify a site's CMS.
+CMS_FAMILY_MARKERS = (
+    ("wordpress", ("wordpress", "/wp-content/", "/wp-includes/")),
+    ("drupal", ("drupal", "/sites/default/files/", "/core/misc/")),
+    ("joomla", ("joomla", "/media/jui/", "/media/system/js/")),
+    ("squarespace", ("squarespace",)),
+    ("wix", ("wix.com", "wixstatic.com")),
+    ("schoolsonline", ("schoolsonline",)),
+)
+
+ContactDetails = tuple[Optional[str], Optional[str]]
+ExtractFunc = Callable[[PageAnalysis, str], ContactDetails]
+EnrichFunc = Callable[[AsyncEthicalHttpClient, str], Awaitable[ContactDetails]]
+ResultCallback = Callable[[Hashable, str, Optional[str], Optional[str], Optional[Exception]], None]
+
+
+def extract_contact_details(page: PageAnalysis, base_url: str) -> ContactDetails:
+    email = (
+        choose_general_email(page.mailto_emails, website_url=base_url, source="mailto")
+        or choose_general_email(page.cloudflare_emails, website_url=base_url, source="cloudflare")
+        or choose_general_email(extract_emails_from_text(page.text), website_url=base_url, source="text")
+    )
+    return email, page.contact_form_url(base_url)
+
+
+def detect_cms_family(page: PageAnalysis) -> Optional[str]:
+    haystack = " ".join([page.generator or "", *page.asset_urls]).lower()
+    for family, markers in CMS_FAMILY_MARKERS:
+        if any(marker in haystack for marker in markers):
+            return family
+    return None
+
+
+def candidate_contact_urls(
+    page: PageAnalysis,
+    base_url: str,
+    limit: int = MAX_CONTACT_PAGES,
+    guesses: Iterable[str] = CONTACT_PATH_GUESSES,
+) -> list[str]:
+    candidates: list[str] = []
+    for href, label in page.links:
+        if not href:
+            continue
+        if "contact" in href.lower() or "contact" in label:
+            candidates.append(urljoin(base_url, href))
+    for path in guesses:
+        candidates.append(urljoin(base_url, path))
+
+    # de-dupe preserving order
+    seen = set()
+    out = []
+    for u in candidates:
+        key = u.lower().rstrip("/")
+        if key in seen:
+            continue
+        seen.add(key)
+        out.append(u)
+    return out[:limit]
+
+
+async def fetch_page(
+    client: AsyncEthicalHttpClient,
+    url: str,
+    error_logger: Optional[logging.Logger] = None,
+) -> tuple[int | None, Optional[requests.Response]]:
+    error_logger = error_logger or logging.getLogger("errors")
+    try:
+        resp = await client.get_page(url)
+        return int(resp.status_code), resp
+    except UnsupportedContentError as exc:
+        # PDFs, images and videos linked as "contact" pages are not worth downloading.
+        return (int(exc.response.status_code) if exc.response is not None else None), None
+    except PermissionError as exc:
+        error_logger.error("Blocked by robots.txt for %s: %s", url, exc)
+        return None, None
+    except requests.exceptions.SSLError as exc:
+        error_logger.error("SSL failed for %s with default and legacy TLS: %s", url, exc)
+        return None, None
+
+
+async def analyse_response(client: AsyncEthicalHttpClient, url: str, resp: requests.Response) -> PageAnalysis:
+    """Analyse a fetched page once per body; extractors only read the result.
+
+    The undecoded body goes to the client's parse workers, when it has any, and only
+    the compact PageAnalysis comes back. Bodies analysed in an earlier run by the same
+    extractor version come from the client's analysis cache instead.
+    """
+    digest = body_digest(resp.content, resp.encoding)
+    cache = client.analysis_cache
+
+    async def parse() -> PageAnalysis:
+        if cache is not None:
+            record = await client.run_blocking(cache.lookup, digest)
+            if record is not None:
+                return PageAnalysis.from_record(record)
+        started = time.monotonic()
+        page = await client.run_cpu(analyse_body, resp.content, resp.encoding)
+        if client.client.metrics is not None:
+            client.client.metrics.observe_stage("parse", time.monotonic() - started)
+        if cache is not None:
+            await client.run_blocking(cache.store, digest, page.to_record())
+        return page
+
+    return await client.parsed_body(digest, parse)
+
+
+async def probe_status(client: AsyncEthicalHttpClient, url: str) -> Optional[int]:
+    try:
+        resp = await client.head(url)
+        resp.close()
+        return int(resp.status_code)
+    except Exception:
+        return None
+
+
+async def probe_contact_path(
+    client: AsyncEthicalHttpClient,
+    base_url: str,
+    path: str,
+    family: Optional[str] = None,
+) -> Optional[bool]:
+    """HEAD one guessed contact path and remember the answer for the host and its CMS family.
+
+    True if it exists, False if it is missing, None if the probe was inconclusive
+    (errors, 405 etc.), which keeps the path worth a full GET.
+    """
+    status = await probe_status(client, urljoin(base_url, path))
+    if status in MISSING_STATUSES:
+        exists: Optional[bool] = False
+    elif status is not None and status < 400:
+        exists = True
+    else:
+        exists = None
+    client.client.path_memory.record(host_key(base_url), family, {path: exists})
+    return exists
+
+
+def _url_key(url: str) -> str:
+    return url.lower().rstrip("/")
+
+
+async def follow_contact_pages(
+    client: AsyncEthicalHttpClient,
+    page: PageAnalysis,
+    base_url: str,
+    email: str | None = None,
+    form_url: str | None = None,
+    extract: ExtractFunc = extract_contact_details,
+) -> ContactDetails:
+    """Fill in a missing email or form from the site's contact pages, cheapest source first.
+
+    Linked contact pages are fetched first. Only while something is still missing are the
+    host's sitemaps consulted; sitemap-listed contact pages replace blind path guesses when
+    the host has any. Otherwise guessed paths are probed one at a time (skipping paths the
+    host, or most hosts on its CMS, answered 404 for before) and fetched if they may exist.
+    Every stage stops as soon as both details are found.
+    """
+
+    async def visit(url: str) -> bool:
+        nonlocal email, form_url
+        try:
+            status_code, resp = await fetch_page(client, url)
+            if resp is None or (status_code is not None and status_code >= 400):
+                return False
+            found_email, found_form = extract(await analyse_response(client, url, resp), url)
+        except Exception:
+            return False
+        email = email or found_email
+        form_url = form_url or found_form
+        return bool(email and form_url)
+
+    linked = candidate_contact_urls(page, base_url, guesses=())
+    for url in linked:
+        if await visit(url):
+            return email, form_url
+    remaining = MAX_CONTACT_PAGES - len(linked)
+    if remaining <= 0:
+        return email, form_url
+    seen = {_url_key(url) for url in linked}
+
+    try:
+        listed = await client.shared(
+            f"sitemap-contacts:{host_key(base_url)}",
+            lambda: client.run_for_host(base_url, discover_contact_urls, client.client, base_url),
+        )
+    except Exception:
+        listed = []
+    if listed:
+        for url in [u for u in listed if _url_key(u) not in seen][:remaining]:
+            if await visit(url):
+                break
+        return email, form_url
+
+    memory = client.client.path_memory
+    host = host_key(base_url)
+    family = detect_cms_family(page)
+    config = client.client.config
+    offline = config.cache_only or config.replay
+    for path in CONTACT_PATH_GUESSES:
+        url = urljoin(base_url, path)
+        if remaining <= 0:
+            break
+        if _url_key(url) in seen or memory.skip(host, family, path):
+            continue
+        seen.add(_url_key(url))
+        if not offline and await probe_contact_path(client, base_url, path, family) is False:
+            continue
+        remaining -= 1
+        if await visit(url):
+            break
+    return email, form_url
+
+
+async def enrich_from_template(client: AsyncEthicalHttpClient, website_url: str) -> ContactDetails:
+    """Contact details from the known contact URL of a recognised site template.
+
+    One request and a targeted read of its body replace the homepage scan and contact page
+    guessing; HTML contact pages the targeted read finds no email on are analysed like any
+    other page. ``(None, None)`` when no template matches, the body lacks the template's
+    markers, or its contact URL has nothing.
+    """
+    matched = match_site_template(website_url)
+    if matched is None:
+        return None, None
+    template, contact_url = matched
+    try:
+        resp = await client.get(contact_url)
+        if resp.status_code >= 400:
+            return None, None
+        started = time.monotonic()
+        body = resp.text
+        if not template.fingerprint(body):
+            return None, None
+        email, form_url = template.extract(body, contact_url)
+        if client.client.metrics is not None:
+            client.client.metrics.observe_stage(f"template:{template.name}", time.monotonic() - started)
+        if not email and template.analyse_page:
+            email, form_url = extract_contact_details(await analyse_response(client, contact_url, resp), contact_url)
+        return email, form_url
+    except Exception:
+        return None, None
+
+
+async def enrich_from_homepage(
+    client: AsyncEthicalHttpClient,
+    website_url: str,
+    extract: ExtractFunc = extract_contact_details,
+) -> ContactDetails:
+    template_email, template_form = await enrich_from_template(client, website_url)
+    if template_email:
+        return template_email, template_form
+    try:
+        status_code, resp = await fetch_page(client, website_url)
+        if resp is None or (status_code is not None and status_code >= 400):
+            return None, None
+        page = await analyse_response(client, website_url, resp)
+        email, form_url = extract(page, website_url)
+        form_url = form_url or template_form
+        if email and form_url:
+            return email, form_url
+        return await follow_contact_pages(client, page, website_url, email, form_url, extract=extract)
+    except Exception:
+        return None, template_form
+
+
+async def enrich_websites(
+    client: AsyncEthicalHttpClient,
+    jobs: Iterable[tuple[Hashable, str]],
+    enrich: EnrichFunc = enrich_from_homepage,
+    budget: Optional[CrawlBudget] = None,
+) -> AsyncIterator[tuple[Hashable, str, ContactDetails, Optional[Exception]]]:
+    """Run jobs in order with a bounded window of open tasks; stop starting new ones once
+    ``budget`` is spent."""
+
+    async def run(key: Hashable, website: str):
+        try:
+            return key, website, await enrich(client, website), None
+        except Exception as exc:
+            return key, website, (None, None), exc
+
+    queue = iter(jobs)
+    window = 2 * client.max_concurrency
+    tasks: set[asyncio.Future] = set()
+
+    def fill() -> None:
+        while len(tasks) < window and not (budget and budget.exhausted()):
+            job = next(queue, None)
+            if job is None:
+                return
+            tasks.add(asyncio.ensure_future(run(*job)))
+
+    try:
+        fill()
+        while tasks:
+            done, _ = await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                tasks.discard(task)
+                yield task.result()
+            fill()
+    finally:
+        for task in tasks:
+            task.cancel()
+
+
+def run_enrichment(
+    client: EthicalHttpClient,
+    jobs: Iterable[tuple[Hashable, str]],
+    on_result: ResultCallback,
+    concurrency: int = 64,
+    enrich: EnrichFunc = enrich_from_homepage,
+    budget: Optional[CrawlBudget] = None,
+    parse_workers: int = 0,
+) -> None:
+    """Enrich ``(key, website_url)`` jobs concurrently, reporting each as it completes.
+
+    Jobs start in the order given; ``CrawlFrontier.plan`` already puts hosts known dead
+    from earlier runs last.
+
+    Pages are fetched on worker threads and, with ``parse_workers`` > 0, parsed in that
+    many processes. With a cache directory configured, page analyses are kept in
+    ``page_analyses.sqlite`` there for later runs.
+    """
+    cache_dir = client.config.cache_dir
+    analysis_cache = AnalysisCache(Path(cache_dir) / "page_analyses.sqlite", EXTRACTOR_VERSION) if cache_dir else None
+
+    async def _run() -> None:
+        async with AsyncEthicalHttpClient(
+            client, max_concurrency=concurrency, parse_workers=parse_workers, analysis_cache=analysis_cache
+        ) as aclient:
+            async for key, website, (email, form_url), exc in enrich_websites(aclient, jobs, enrich, budget):
+                on_result(key, website, email, form_url, exc)
+
+    try:
+        asyncio.run(_run())
+    finally:
+        if analysis_cache is not None:
+            analysis_cache.close()
+
+
+def add_enrichment_args(parser: argparse.ArgumentParser, checkpoint_every: int = 50) -> None:
+    """Command-line options shared by the state contact enrichment scripts."""
+    parser.add_argument("--max-sites", type=int, default=0, help="Optional limit of website rows to process (0=all)")
+    parser.add_argument(
+        "--checkpoint-every", type=int, default=checkpoint_every, help="Save CSV every N attempted rows"
+    )
+    parser.add_argument(
+        "--concurrency", type=int, default=64, help="Maximum in-flight requests across all school hosts"
+    )
+    parser.add_argument(
+        "--parse-workers",
+        type=int,
+        default=os.cpu_count() or 1,
+        help="Processes for HTML parsing (0 = parse in the event loop)",
+    )
+    parser.add_argument(
+        "--cache-only", action="store_true", help="Re-extract from cached responses without network access"
+    )
+    parser.add_argument(
+        "--replay", action="store_true", help="Re-extract from the crawl archive instead of the network"
+    )
+    parser.add_argument(
+        "--skip-dead-hosts", action="store_true", help="Skip hosts that failed repeatedly in earlier runs"
+    )
+    parser.add_argument(
+        "--revisit-checked", action="store_true", help="Also queue rows checked in earlier runs (lowest priority)"
+    )
+    parser.add_argument("--budget-minutes", type=float, default=0, help="Stop starting new sites after N minutes")
+    parser.add_argument("--budget-requests", type=int, default=0, help="Stop starting new sites after N requests")
+
+
+def enrichment_http_config(
+    config: dict,
+    root: Path,
+    args: argparse.Namespace,
+    max_retries: int = 1,
+    backoff_factor: float = 0.5,
+) -> HttpConfig:
+    """HTTP settings for an enrichment run from ``config.yml`` and :func:`add_enrichment_args` options."""
+    return HttpConfig(
+        user_agent=config["user_agent"],
+        request_delay_seconds=config["request_delay_seconds"],
+        timeout_seconds=int(config["timeout_seconds"]),
+        adaptive_timeouts=True,
+        max_retries=max_retries,
+        backoff_factor=backoff_factor,
+        cache_dir=str(root / config["cache"]["dir"]),
+        metrics_jsonl=str(root / config["logging"]["metrics_jsonl"]),
+        metrics_prometheus=config["logging"]["metrics_prometheus"] or None,
+        cache_only=args.cache_only,
+        replay=args.replay,
+        skip_dead_hosts=args.skip_dead_hosts,
+    )
+
+
+def run_state_enrichment(
+    state: str,
+    df: pd.DataFrame,
+    client: EthicalHttpClient,
+    args: argparse.Namespace,
+    out_csv: Path,
+    error_logger: logging.Logger,
+    enrich: EnrichFunc = enrich_from_homepage,
+    replaceable_emails: Iterable[str] = (),
+) -> None:
+    """Enrich the rows of ``df`` that have a ``website_url``, saving ``out_csv`` every
+    ``--checkpoint-every`` sites and when the run ends or is interrupted.
+
+    Found emails and contact forms only fill empty cells, or emails listed in
+    ``replaceable_emails``.
+    """
+    label = state.upper()
+    replaceable = {email.lower() for email in replaceable_emails}
+    frontier = CrawlFrontier(Path(client.config.cache_dir) / "frontier.sqlite")
+    candidates: list[FrontierJob] = []
+    for i, row in df.iterrows():
+        website = row.get("website_url")
+        if isinstance(website, str) and website:
+            candidates.append(FrontierJob.from_row(i, website, row))
+    # Offline runs re-extract already checked rows from stored pages; their results were
+    # already counted in host yields when those pages were fetched.
+    offline = client.config.cache_only or client.config.replay
+    jobs = frontier.plan(
+        state,
+        candidates,
+        include_checked=args.revisit_checked or offline,
+        is_known_dead=client.is_known_dead,
+        limit=args.max_sites,
+    )
+    budget = CrawlBudget(client, minutes=args.budget_minutes, requests=args.budget_requests)
+
+    processed = 0
+    attempted = 0
+
+    def save() -> None:
+        df["last_verified_date"] = date.today().isoformat()
+        df.to_csv(out_csv, index=False)
+
+    def on_result(i: int, website: str, email: str | None, form_url: str | None, exc: Exception | None) -> None:
+        nonlocal processed, attempted
+        attempted += 1
+        df.at[i, "website_checked"] = "true"
+        frontier.record(state, i, website, found_email=bool(email), update_yield=not offline)
+        if exc is not None:
+            error_logger.error("%s website enrichment failed (%s): %s", label, website, exc, exc_info=exc)
+        else:
+            existing_email = str(df.at[i, "public_email"] or "").strip()
+            existing_form = str(df.at[i, "contact_form_url"] or "").strip()
+            if existing_email.lower() in replaceable:
+                existing_email = ""
+            if email and (not existing_email or existing_email.lower() == "nan"):
+                df.at[i, "public_email"] = email
+            if form_url and (not existing_form or existing_form.lower() == "nan"):
+                df.at[i, "contact_form_url"] = form_url
+            processed += 1
+
+        if attempted % args.checkpoint_every == 0:
+            save()
+            print(
+                f"{label} website enrichment attempted: {attempted}, processed: {processed} (checkpoint saved)",
+                flush=True,
+            )
+
+    try:
+        run_enrichment(
+            client,
+            jobs,
+            on_result,
+            concurrency=args.concurrency,
+            enrich=enrich,
+            budget=budget,
+            parse_workers=args.parse_workers,
+        )
+    except KeyboardInterrupt:
+        print(f"{label} enrichment interrupted; saving progress...", flush=True)
+    finally:
+        save()
+        frontier.close()
+
+    print(f"{label} website enrichment complete on {processed} rows (attempted {attempted} sites)", flush=True)
+    print(f"Saved: {out_csv}")
@@ -1,11 +1,17 @@
 from __future__ import annotations
 
+import html as html_lib
 import json
 import re
-from typing import Iterable, Optional
+from dataclasses import asdict, dataclass, field
+from functools import lru_cache
+from typing import Any, Iterable, Optional
 from urllib.parse import urljoin, urlparse
 
-from bs4 import BeautifulSoup
+import numpy as np
+import pandas as pd
+from bs4 import BeautifulSoup, Tag
+from requests.compat import chardet
 
 GENERAL_PREFIXES = (
     "info@",
@@ -32,7 +38,26 @@ OBFUSCATED_EMAIL_WORD_RE = re.compile(
     re.IGNORECASE,
 )
 POSTCODE_RE = re.compile(r"\b(\d{4})\b")
+RAW_TEXT_TAGS = {"script", "style", "template", "textarea", "title"}
+# Raw-markup tokens for PageAnalysis.from_html: comments, elements whose content is not
+# markup (captured whole), start/end tags, and doctypes / processing instructions.
+HTML_TOKEN_RE = re.compile(
+    r"<!--.*?-->"
+    r"|<(script|style|template|textarea|title)\b((?:\"[^\"]*\"|'[^']*'|[^'\">])*)>(.*?)</\1\s*>"
+    r"|<(/?)([a-z][a-z0-9:-]*)\b((?:\"[^\"]*\"|'[^']*'|[^'\">])*)>"
+    r"|<[!?][^>]*>",
+    re.IGNORECASE | re.DOTALL,
+)
+HTML_ATTR_RE = re.compile(r"""([^\s"'=<>/]+)(?:\s*=\s*("[^"]*"|'[^']*'|[^\s>]+))?""")
+URL_ORIGIN_RE = re.compile(r"^[A-Za-z][A-Za-z0-9+.-]*://[^/?#]*")
 INVISIBLE_CHARS_RE = re.compile(r"[\u200b\u200c\u200d\u2060\ufeff]")
+EMAIL_TRIM_CHARS = ".,;:!?\"'`()[]{}<>"
+# Vectorised form of the %20 / "+" loop in _normalise_email_candidate.
+LEADING_ENCODED_SPACE_RE = re.compile(r"^(?:(?=%20|\+)[%20]*\+*\s*)+")
+# Entries per memoised classification helper; each entry is a few short strings.
+CLASSIFY_CACHE_SIZE = 65536
+# Bump whenever what PageAnalysis collects from a page changes; cached analyses of older versions are discarded.
+EXTRACTOR_VERSION = "1"
 ALLOWED_TLDS = {"au", "com", "org", "net", "edu", "gov", "school", "online"}
 PLACEHOLDER_DOMAINS = {"example.com", "test.com", "domain.com", "email.com", "yourdomain.com"}
 
@@ -69,7 +94,7 @@ def _unique(values: Iterable[str]) -> list[str]:
 
 def _normalise_email_candidate(value: str) -> str:
     clean = INVISIBLE_CHARS_RE.sub("", value or "")
-    clean = clean.strip().lower().strip(".,;:!?\"'`()[]{}<>")
+    clean = clean.strip().lower().strip(EMAIL_TRIM_CHARS)
     # Strip URL-encoded spaces that sometimes leak from href attributes (%20, +)
     while clean.startswith(("%20", "+")):
         clean = clean.lstrip("%20").lstrip("+").lstrip()
@@ -84,8 +109,15 @@ def _extract_hostname(url: str | None) -> str | None:
         return None
     if "://" not in raw:
         raw = "https://" + raw
+    # Only the scheme and authority matter, so all pages of a site share one cache entry.
+    origin = URL_ORIGIN_RE.match(raw)
+    return _hostname(origin.group(0) if origin else raw)
+
+
+@lru_cache(maxsize=CLASSIFY_CACHE_SIZE)
+def _hostname(url: str) -> str | None:
     try:
-        host = (urlparse(raw).hostname or "").strip().lower()
+        host = (urlparse(url).hostname or "").strip().lower()
     except Exception:
         return None
     if host.startswith("www."):
@@ -93,6 +125,7 @@ def _extract_hostname(url: str | None) -> str | None:
     return host or None
 
 
+@lru_cache(maxsize=CLASSIFY_CACHE_SIZE)
 def _registrable_domain(host: str) -> str:
     labels = [p for p in host.split(".") if p]
     if len(labels) < 2:
@@ -103,6 +136,7 @@ def _registrable_domain(host: str) -> str:
     return ".".join(labels[-2:])
 
 
+@lru_cache(maxsize=CLASSIFY_CACHE_SIZE)
 def _domains_related(email_domain: str, website_host: str) -> bool:
     if (
         email_domain == website_host
@@ -118,8 +152,13 @@ def classify_public_email(
 ) -> tuple[str | None, str, str]:
     if not email:
         return None, "invalid", "empty"
+    # Cached on the normalised address and website host, so the same email seen on
+    # different pages of a site (or in every run over a state) is classified once.
+    return _classify_normalised(_normalise_email_candidate(str(email)), _extract_hostname(website_url), source)
 
-    clean = _normalise_email_candidate(str(email))
+
+@lru_cache(maxsize=CLASSIFY_CACHE_SIZE)
+def _classify_normalised(clean: str, website_host: str | None, source: str) -> tuple[str | None, str, str]:
     if not clean:
         return None, "invalid", "empty"
     if " " in clean or clean.count("@") != 1:
@@ -141,7 +180,6 @@ def classify_public_email(
     if tld not in ALLOWED_TLDS:
         return None, "invalid", "invalid_tld"
 
-    website_host = _extract_hostname(website_url)
     # For directory-provided records, domain mismatch with website is common and not
     # a reliable signal. Only enforce strict domain relationship for website text extraction.
     # Trusted government education domains are exempt: state depts use a central email
@@ -159,6 +197,96 @@ def classify_public_email(
     return clean, "valid", "ok"
 
 
+def classify_public_emails(
+    emails: pd.Series, websites: Optional[pd.Series] = None, source: str = "text"
+) -> pd.DataFrame:
+    """classify_public_email over a whole column, using vectorised string operations.
+
+    ``websites`` is aligned with ``emails`` by index. Returns a frame on the same index
+    with ``email`` (normalised, None when invalid), ``status`` and ``reason`` columns.
+    Missing values count as empty. Each distinct email, website and (domain, host) pair
+    is processed once.
+    """
+    if emails.empty:
+        return pd.DataFrame(columns=["email", "status", "reason"], index=emails.index, dtype=object)
+    email_codes, unique_emails = pd.factorize(emails.where(emails.notna(), "").astype(str))
+    clean = pd.Series(unique_emails, dtype=str)
+    clean = clean.str.replace(INVISIBLE_CHARS_RE.pattern, "", regex=True).str.strip().str.lower()
+    clean = clean.str.strip(EMAIL_TRIM_CHARS)
+    encoded = clean.str.startswith(("%20", "+"))
+    if encoded.any():
+        clean[encoded] = clean[encoded].str.replace(LEADING_ENCODED_SPACE_RE.pattern, "", regex=True)
+    # Same pieces as split("@", 1) and rsplit(".", 1).
+    parts = clean.str.partition("@")
+    local, domain = parts[0], parts[2]
+    tld = domain.str.rpartition(".")[2]
+
+    # In classify_public_email order: the first failing check gives the reason.
+    checks = [
+        ("empty", clean == ""),
+        # EMAIL_EXACT_RE already rejects spaces and anything but exactly one "@".
+        ("invalid_format", ~clean.str.match(EMAIL_EXACT_RE.pattern, case=False)),
+        ("local_too_short", local.str.len() < 2),
+        ("placeholder_domain", domain.isin(PLACEHOLDER_DOMAINS)),
+        ("missing_tld", ~domain.str.contains(".", regex=False)),
+        ("invalid_tld_format", ~tld.str.fullmatch(r"[a-z]{2,}")),
+        ("invalid_tld", ~tld.isin(ALLOWED_TLDS)),
+    ]
+    unique_reasons = np.select(
+        [mask.to_numpy(dtype=bool) for _, mask in checks], [name for name, _ in checks], default="ok"
+    ).astype(object)
+    reason = unique_reasons[email_codes]
+    status = np.where(reason == "ok", "valid", "invalid").astype(object)
+
+    if websites is not None and source not in {"directory", "mixed"}:
+        # Same normalisation as _extract_hostname, then one hostname parse per site origin.
+        urls = websites.reindex(emails.index)
+        urls = urls.where(urls.notna(), "").astype(str).str.strip()
+        urls = urls.where(urls.str.contains("://", regex=False) | (urls == ""), "https://" + urls)
+        origins = urls.str.extract(f"({URL_ORIGIN_RE.pattern})", expand=False).fillna(urls)
+        website_codes, unique_origins = pd.factorize(origins)
+        hosts = [_hostname(origin) if origin else None for origin in unique_origins]
+        has_host = np.array([h is not None for h in hosts], dtype=bool)
+        checkable = (unique_reasons == "ok") & ~domain.isin(TRUSTED_GOV_EMAIL_DOMAINS).to_numpy()
+        check = checkable[email_codes] & has_host[website_codes]
+        stride = len(hosts)
+        pairs, inverse = np.unique(
+            email_codes[check].astype(np.int64) * stride + website_codes[check], return_inverse=True
+        )
+        domains = domain.to_numpy(dtype=object)
+        related = np.array([_domains_related(domains[p // stride], hosts[p % stride]) for p in pairs], dtype=bool)
+        unrelated = np.zeros(len(reason), dtype=bool)
+        unrelated[check] = ~related[inverse]
+        if source == "text":
+            reason[unrelated] = "unrelated_domain_low_confidence"
+            status[unrelated] = "invalid"
+        else:
+            reason[unrelated] = "unrelated_domain"
+            status[unrelated] = "suspicious"
+
+    cleaned = clean.to_numpy(dtype=object)[email_codes]
+    return pd.DataFrame(
+        {"email": np.where(status != "invalid", cleaned, None), "status": status, "reason": reason},
+        index=emails.index,
+        dtype=object,
+    )
+
+
+def classification_cache_info() -> dict[str, Any]:
+    """Hit/miss counters of the email classification caches, keyed by helper name."""
+    return {
+        "classify": _classify_normalised.cache_info(),
+        "hostname": _hostname.cache_info(),
+        "registrable_domain": _registrable_domain.cache_info(),
+        "domains_related": _domains_related.cache_info(),
+    }
+
+
+def clear_classification_cache() -> None:
+    for helper in (_classify_normalised, _hostname, _registrable_domain, _domains_related):
+        helper.cache_clear()
+
+
 def extract_emails_from_text(text: str) -> list[str]:
     if not text:
         return []
@@ -170,17 +298,18 @@ def extract_emails_from_text(text: str) -> list[str]:
     return _unique(emails)
 
 
-def extract_mailto_emails(soup: BeautifulSoup) -> list[str]:
-    emails = []
-    for a in soup.select("a[href^='mailto:']"):
-        href = a.get("href", "").split("mailto:", 1)[-1].split("?", 1)[0].strip()
-        if not href:
-            continue
-        for part in re.split(r"[;,]", href):
-            part = part.strip()
-            if part:
-                emails.append(part)
-    return _unique(emails)
+def _mailto_addresses(href: str) -> list[str]:
+    href = href.split("mailto:", 1)[-1].split("?", 1)[0].strip()
+    return [part.strip() for part in re.split(r"[;,]", href) if part.strip()]
+
+
+def _parse_attrs(source: str) -> dict[str, str]:
+    attrs: dict[str, str] = {}
+    for name, value in HTML_ATTR_RE.findall(source):
+        if value[:1] in ("'", '"'):
+            value = value[1:-1]
+        attrs.setdefault(name.lower(), html_lib.unescape(value))
+    return attrs
 
 
 def _decode_cloudflare_email(encoded: str) -> str:
@@ -195,33 +324,206 @@ def _decode_cloudflare_email(encoded: str) -> str:
     return decoded.strip()
 
 
-def extract_cloudflare_protected_emails(soup: BeautifulSoup) -> list[str]:
-    emails = []
-    for node in soup.select("[data-cfemail]"):
-        encoded = (node.get("data-cfemail") or "").strip()
-        if not encoded:
-            continue
-        decoded = _decode_cloudflare_email(encoded)
-        if decoded:
-            emails.append(decoded)
-    return _unique(emails)
+@dataclass
+class PageAnalysis:
+    """Everything the extractors read from a page, collected in one pass over it."""
+
+    # Same as soup.get_text("\n", strip=True).
+    text: str = ""
+    h1: Optional[str] = None
+    # (stripped href, lower-cased link text) for every <a href>, in document order.
+    links: list[tuple[str, str]] = field(default_factory=list)
+    mailto_emails: list[str] = field(default_factory=list)
+    cloudflare_emails: list[str] = field(default_factory=list)
+    # Action of the first <form>: None when the page has no form, "" when it has no action.
+    form_action: Optional[str] = None
+    jsonld: list[Any] = field(default_factory=list)
+    generator: Optional[str] = None
+    # <script src> and <link href> values, for CMS fingerprinting.
+    asset_urls: list[str] = field(default_factory=list)
+
+    @classmethod
+    def from_soup(cls, soup: BeautifulSoup) -> "PageAnalysis":
+        page = cls()
+        text_types = soup.interesting_string_types
+        strings: list[str] = []
+        for node in soup.descendants:
+            if not isinstance(node, Tag):
+                if type(node) in text_types:
+                    value = node.strip()
+                    if value:
+                        strings.append(value)
+                continue
+            page._add_tag(node.name, node.attrs)
+            if node.name == "a" and "href" in node.attrs:
+                page.links.append(((node.get("href") or "").strip(), node.get_text(" ", strip=True).lower()))
+            elif node.name == "h1" and page.h1 is None:
+                page.h1 = node.get_text(" ", strip=True)
+            elif node.name == "script" and node.get("type") == "application/ld+json":
+                page._add_jsonld(node.get_text(strip=True))
+        return page._finish(strings)
+
+    @classmethod
+    def from_html(cls, html: str) -> Optional["PageAnalysis"]:
+        """Scan raw markup without building a DOM.
+
+        Returns None when the full DOM pipeline should run instead: the page has no email
+        candidates at all, or uses markup the scanner cannot read the way lxml would
+        (CDATA, unterminated comments, nested or unclosed links and headings).
+        """
+        if "<![CDATA[" in html or html.count("<!--") > html.count("-->"):
+            return None
+        page = cls()
+        strings: list[str] = []
+        label: Optional[list[str]] = None  # text of the open <a href>
+        heading: Optional[list[str]] = None  # text of the first, still open <h1>
+        in_anchor = False
+        pos = 0
+        for match in HTML_TOKEN_RE.finditer(html):
+            chunk = html_lib.unescape(html[pos : match.start()]).strip()
+            pos = match.end()
+            if chunk:
+                strings.append(chunk)
+                for pieces in (label, heading):
+                    if pieces is not None:
+                        pieces.append(chunk)
+            raw_name, raw_attrs, raw_body, closing, name, tag_attrs = match.groups()
+            if raw_name:
+                # Elements whose content is not markup.
+                raw_name = raw_name.lower()
+                attrs = _parse_attrs(raw_attrs)
+                page._add_tag(raw_name, attrs)
+                if raw_name in ("textarea", "title"):
+                    value = html_lib.unescape(raw_body).strip()
+                    if value:
+                        strings.append(value)
+                elif raw_name == "script" and attrs.get("type") == "application/ld+json":
+                    page._add_jsonld(raw_body.strip())
+                continue
+            if not name:
+                continue  # comment, doctype or processing instruction
+            name = name.lower()
+            if name in RAW_TEXT_TAGS and not closing:
+                return None  # unterminated script/style etc.
+            if closing:
+                if name == "a" and in_anchor:
+                    in_anchor = False
+                    if label is not None:
+                        page.links[-1] = (page.links[-1][0], " ".join(label).lower())
+                        label = None
+                elif name == "h1" and heading is not None:
+                    page.h1 = " ".join(heading)
+                    heading = None
+                continue
+            attrs = _parse_attrs(tag_attrs)
+            page._add_tag(name, attrs)
+            if name == "a":
+                if in_anchor:
+                    return None
+                in_anchor = True
+                if "href" in attrs:
+                    page.links.append(((attrs["href"] or "").strip(), ""))
+                    label = []
+            elif name == "h1" and page.h1 is None:
+                if heading is not None:
+                    return None
+                heading = []
+        tail = html_lib.unescape(html[pos:]).strip()
+        if tail:
+            strings.append(tail)
+        if in_anchor or heading is not None:
+            return None
+        page._finish(strings)
+        if not (page.mailto_emails or page.cloudflare_emails or EMAIL_RE.search(page.text)):
+            return None
+        return page
+
+    def _add_tag(self, name: str, attrs: dict) -> None:
+        if name == "a" and "href" in attrs:
+            href = attrs["href"] or ""
+            if href.startswith("mailto:"):
+                self.mailto_emails.extend(_mailto_addresses(href))
+        elif name == "form":
+            if self.form_action is None:
+                self.form_action = (attrs.get("action") or "").strip()
+        elif name == "script" and "src" in attrs:
+            self.asset_urls.append(attrs["src"] or "")
+        elif name == "link" and "href" in attrs:
+            self.asset_urls.append(attrs["href"] or "")
+        elif name == "meta" and self.generator is None and attrs.get("name") == "generator":
+            self.generator = attrs.get("content") or ""
+        if "data-cfemail" in attrs:
+            decoded = _decode_cloudflare_email((attrs["data-cfemail"] or "").strip())
+            if decoded:
+                self.cloudflare_emails.append(decoded)
+
+    def _add_jsonld(self, raw: str) -> None:
+        try:
+            self.jsonld.append(json.loads(raw))
+        except Exception:
+            pass
+
+    def _finish(self, strings: list[str]) -> "PageAnalysis":
+        self.text = "\n".join(strings)
+        self.mailto_emails = _unique(self.mailto_emails)
+        self.cloudflare_emails = _unique(self.cloudflare_emails)
+        return self
+
+    def to_record(self) -> dict[str, Any]:
+        """JSON-serialisable form, for the analysis cache."""
+        return asdict(self)
+
+    @classmethod
+    def from_record(cls, record: dict[str, Any]) -> "PageAnalysis":
+        page = cls(**record)
+        page.links = [(href, label) for href, label in page.links]
+        return page
+
+    def contact_form_url(self, base_url: str) -> Optional[str]:
+        if self.form_action is not None:
+            return urljoin(base_url, self.form_action) if self.form_action else base_url
+        for href, label in self.links:
+            if "contact" in href.lower() or "contact" in label:
+                return urljoin(base_url, href)
+        return None
+
+
+def analyse_page(html: str) -> PageAnalysis:
+    """Fast raw-markup scan, falling back to a full lxml parse when it is not conclusive."""
+    return PageAnalysis.from_html(html) or PageAnalysis.from_soup(BeautifulSoup(html, "lxml"))
+
+
+def decode_body(content: bytes, encoding: Optional[str]) -> str:
+    """Response.text for a raw body: the declared charset, else a detected one."""
+    if not content:
+        return ""
+    if encoding is None:
+        encoding = chardet.detect(content)["encoding"] if chardet is not None else "utf-8"
+    try:
+        return str(content, encoding, errors="replace")
+    except (LookupError, TypeError):
+        return str(content, errors="replace")
+
 
+def analyse_body(content: bytes, encoding: Optional[str] = None) -> PageAnalysis:
+    """analyse_page for an undecoded response body, so parse worker processes also do the decoding."""
+    return analyse_page(decode_body(content, encoding))
 
-def extract_contact_form_url(soup: BeautifulSoup, base_url: str) -> Optional[str]:
-    form = soup.find("form")
-    if form:
-        action = (form.get("action") or "").strip()
-        if action:
-            return urljoin(base_url, action)
-        return base_url
 
-    for a in soup.select("a[href]"):
-        href = a.get("href", "").strip()
-        label = (a.get_text(" ", strip=True) or "").lower()
-        if "contact" in href.lower() or "contact" in label:
-            return urljoin(base_url, href)
+def _analysis(page: BeautifulSoup | PageAnalysis) -> PageAnalysis:
+    return page if isinstance(page, PageAnalysis) else PageAnalysis.from_soup(page)
 
-    return None
+
+def extract_mailto_emails(page: BeautifulSoup | PageAnalysis) -> list[str]:
+    return list(_analysis(page).mailto_emails)
+
+
+def extract_cloudflare_protected_emails(page: BeautifulSoup | PageAnalysis) -> list[str]:
+    return list(_analysis(page).cloudflare_emails)
+
+
+def extract_contact_form_url(page: BeautifulSoup | PageAnalysis, base_url: str) -> Optional[str]:
+    return _analysis(page).contact_form_url(base_url)
 
 
 def choose_general_email(
@@ -261,7 +563,8 @@ def choose_general_email(
     return candidates[0].lower()
 
 
-def extract_school_core_fields(soup: BeautifulSoup, page_url: str) -> dict:
+def extract_school_core_fields(page: BeautifulSoup | PageAnalysis, page_url: str) -> dict:
+    page = _analysis(page)
     result = {
         "school_name": None,
         "suburb": None,
@@ -271,39 +574,30 @@ def extract_school_core_fields(soup: BeautifulSoup, page_url: str) -> dict:
         "website_url": None,
     }
 
-    h1 = soup.find("h1")
-    if h1:
-        result["school_name"] = h1.get_text(" ", strip=True)
+    result["school_name"] = page.h1
 
-    all_text = soup.get_text("\n", strip=True)
+    all_text = page.text
 
     phone_match = re.search(r"(?:\+?61\s?|0)[2-9]\d(?:[\s-]?\d){7,8}", all_text)
     if phone_match:
         result["phone"] = phone_match.group(0)
 
-    mailto_emails = extract_mailto_emails(soup)
     text_emails = extract_emails_from_text(all_text)
     result["public_email"] = choose_general_email(
-        mailto_emails, website_url=page_url, source="mailto"
+        page.mailto_emails, website_url=page_url, source="mailto"
     ) or choose_general_email(text_emails, website_url=page_url, source="text")
 
     postcode_match = POSTCODE_RE.search(all_text)
     if postcode_match:
         result["postcode"] = postcode_match.group(1)
 
-    for a in soup.select("a[href]"):
-        href = a.get("href", "")
+    for href, _ in page.links:
         if "http" in href and any(k in href.lower() for k in ["school", "college", ".edu", ".nsw"]):
             if "isnsw" not in href and "csnsw" not in href:
                 result["website_url"] = href
                 break
 
-    for script in soup.select("script[type='application/ld+json']"):
-        try:
-            data = json.loads(script.get_text(strip=True))
-        except Exception:
-            continue
-
+    for data in page.jsonld:
         items = data if isinstance(data, list) else [data]
         for item in items:
             if not isinstance(item, dict):
@@ -0,0 +1,67 @@
+from __future__ import annotations
+
+import math
+import threading
+from collections import deque
+from typing import Optional
+
+
+def host_family(host: str) -> Optional[str]:
+    """Parent domain shared by related school hosts, e.g. ``det.wa.edu.au`` or ``catholic.edu.au``.
+
+    Hosts directly under a public suffix such as ``com.au`` have no family.
+    """
+    labels = host.split(".")
+    if len(labels) < 4 or labels[-1].isdigit():
+        return None
+    return ".".join(labels[1:])
+
+
+class LatencyTracker:
+    """Rolling window of response latencies per host and per host family."""
+
+    def __init__(self, window: int = 50, min_samples: int = 5) -> None:
+        self.window = max(1, int(window))
+        self.min_samples = max(1, int(min_samples))
+        self._samples: dict[str, deque[float]] = {}
+        # Longest wait that ended in a read timeout, per host: a floor for its percentiles.
+        self._timed_out: dict[str, float] = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _keys(host: str) -> list[str]:
+        family = host_family(host)
+        return [host, f"*.{family}"] if family else [host]
+
+    def record(self, host: str, seconds: float) -> None:
+        with self._lock:
+            for key in self._keys(host):
+                samples = self._samples.get(key)
+                if samples is None:
+                    samples = self._samples[key] = deque(maxlen=self.window)
+                samples.append(seconds)
+
+    def record_timeout(self, host: str, seconds: float) -> None:
+        """The host did not answer within ``seconds``: its latency is at least that from now on."""
+        with self._lock:
+            self._timed_out[host] = max(seconds, self._timed_out.get(host, 0.0))
+            samples = self._samples.get(host)
+            if samples is None:
+                samples = self._samples[host] = deque(maxlen=self.window)
+            samples.append(seconds)
+
+    def percentile(self, host: str, q: float) -> Optional[float]:
+        """``q``-quantile of the host's latencies, or its family's while the host has too few samples.
+
+        Never below a wait that already timed out for the host, so a slow host in a fast family
+        gets longer timeouts instead of timing out again.
+        """
+        floor = self._timed_out.get(host)
+        with self._lock:
+            for key in self._keys(host):
+                samples = self._samples.get(key)
+                if samples and len(samples) >= self.min_samples:
+                    ordered = sorted(samples)
+                    value = ordered[min(len(ordered) - 1, math.ceil(q * len(ordered)) - 1)]
+                    return value if floor is None else max(value, floor)
+        return floor
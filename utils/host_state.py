@@ -0,0 +1,174 @@
+from __future__ import annotations
+
+import json
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Optional
+
+
+class HostStateStore:
+    """Small per-host key/value memory that survives between crawl runs."""
+
+    def __init__(self, path: str | Path) -> None:
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(self.path, check_same_thread=False)
+        self._lock = threading.Lock()
+        with self._lock:
+            self._conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS host_state (
+                    host TEXT NOT NULL,
+                    key TEXT NOT NULL,
+                    value TEXT NOT NULL,
+                    updated_at REAL NOT NULL,
+                    PRIMARY KEY (host, key)
+                )
+                """
+            )
+            self._conn.commit()
+
+    def get(self, host: str, key: str) -> Optional[str]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value FROM host_state WHERE host = ? AND key = ?", (host, key)
+            ).fetchone()
+        return row[0] if row else None
+
+    def set(self, host: str, key: str, value: str) -> None:
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO host_state VALUES (?, ?, ?, ?)", (host, key, value, time.time())
+            )
+            self._conn.commit()
+
+    def delete(self, host: str, key: str) -> None:
+        with self._lock:
+            self._conn.execute("DELETE FROM host_state WHERE host = ? AND key = ?", (host, key))
+            self._conn.commit()
+
+    def items(self, key: str) -> dict[str, tuple[str, float]]:
+        """All hosts with a value for ``key``, as ``{host: (value, updated_at)}``."""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT host, value, updated_at FROM host_state WHERE key = ?", (key,)
+            ).fetchall()
+        return {host: (value, float(updated_at)) for host, value, updated_at in rows}
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+class HostCircuitBreaker:
+    """Opens a host's circuit after ``threshold`` consecutive failures.
+
+    Open circuits stay open for the rest of the run and are saved to the store, so
+    the next run can push those hosts to the back of the queue or skip them.
+    """
+
+    def __init__(
+        self,
+        threshold: int = 3,
+        store: Optional[HostStateStore] = None,
+        dead_host_ttl_seconds: float = 7 * 86400,
+        skip_known_dead: bool = False,
+    ) -> None:
+        self.threshold = max(1, int(threshold))
+        self.store = store
+        self._failures: dict[str, int] = {}
+        self._open: set[str] = set()
+        self._lock = threading.Lock()
+        now = time.time()
+        saved = store.items("circuit") if store else {}
+        self._known_dead = {
+            host for host, (_, opened_at) in saved.items() if now - opened_at < dead_host_ttl_seconds
+        }
+        if skip_known_dead:
+            self._open.update(self._known_dead)
+
+    def allow(self, host: str) -> bool:
+        return host not in self._open
+
+    def is_known_dead(self, host: str) -> bool:
+        return host in self._open or host in self._known_dead
+
+    def record_success(self, host: str) -> None:
+        with self._lock:
+            self._failures.pop(host, None)
+            revived = host in self._known_dead
+            self._known_dead.discard(host)
+        if revived and self.store:
+            self.store.delete(host, "circuit")
+
+    def record_failure(self, host: str) -> bool:
+        with self._lock:
+            count = self._failures.get(host, 0) + 1
+            self._failures[host] = count
+            opened = count >= self.threshold and host not in self._open
+            if opened:
+                self._open.add(host)
+        if opened and self.store:
+            self.store.set(host, "circuit", "open")
+        return opened
+
+
+class MissingPathMemory:
+    """Remembers which guessed URL paths a host does not serve, and how often each path
+    is missing across hosts built on the same CMS family.
+
+    Family counters are stored under the ``cms_paths`` key with the family name in the
+    host column.
+    """
+
+    def __init__(
+        self,
+        store: Optional[HostStateStore] = None,
+        ttl_seconds: float = 30 * 86400,
+        family_min_misses: int = 8,
+    ) -> None:
+        self.store = store
+        self.ttl_seconds = ttl_seconds
+        self.family_min_misses = family_min_misses
+        self._lock = threading.Lock()
+        # host -> {path: last seen missing}, family -> {path: [found, missing]}
+        self._hosts: dict[str, dict[str, float]] = {}
+        self._families: dict[str, dict[str, list[int]]] = {}
+        if store:
+            for host, (value, _) in store.items("missing_paths").items():
+                self._hosts[host] = json.loads(value)
+            for family, (value, _) in store.items("cms_paths").items():
+                self._families[family] = json.loads(value)
+
+    def skip(self, host: str, family: Optional[str], path: str) -> bool:
+        missing_since = self._hosts.get(host, {}).get(path)
+        if missing_since is not None and time.time() - missing_since < self.ttl_seconds:
+            return True
+        if family:
+            found, missing = self._families.get(family, {}).get(path, (0, 0))
+            return missing >= self.family_min_misses and found * 20 < missing
+        return False
+
+    def record(self, host: str, family: Optional[str], results: dict[str, Optional[bool]]) -> None:
+        """Store probe results as ``{path: exists}``; ``None`` means the probe was inconclusive."""
+        now = time.time()
+        with self._lock:
+            paths = self._hosts.setdefault(host, {})
+            counters = self._families.setdefault(family, {}) if family else {}
+            for path, exists in results.items():
+                if exists is None:
+                    continue
+                if exists:
+                    paths.pop(path, None)
+                else:
+                    paths[path] = now
+                if family:
+                    counters.setdefault(path, [0, 0])[0 if exists else 1] += 1
+            host_value = json.dumps(paths)
+            family_value = json.dumps(counters)
+        if self.store:
+            self.store.set(host, "missing_paths", host_value)
+            if family:
+                self.store.set(family, "cms_paths", family_value)
@@ -0,0 +1,120 @@
+from __future__ import annotations
+
+import importlib.util
+from typing import Optional
+
+import requests
+from requests import PreparedRequest, Response
+from requests.adapters import BaseAdapter
+from requests.structures import CaseInsensitiveDict
+from requests.utils import get_encoding_from_headers
+
+try:
+    import httpx
+except ImportError:
+    httpx = None
+if httpx is not None and importlib.util.find_spec("h2") is None:
+    # Without h2, httpx can only speak HTTP/1.1, which the urllib3 pool already does.
+    httpx = None
+
+# Connection-specific headers are invalid in HTTP/2; httpx manages them itself.
+HOP_BY_HOP_HEADERS = {"connection", "keep-alive", "proxy-connection", "transfer-encoding", "upgrade"}
+
+
+def http2_available() -> bool:
+    return httpx is not None
+
+
+class _HttpxRaw:
+    """File-like view of a streaming httpx response, enough for requests' iter_content()."""
+
+    def __init__(self, response: "httpx.Response") -> None:
+        self._response = response
+        self._chunks = response.iter_bytes()
+        self._buffer = b""
+        self.version = response.http_version
+
+    def read(self, amt: Optional[int] = None, **_) -> bytes:
+        while amt is None or len(self._buffer) < amt:
+            try:
+                chunk = next(self._chunks, b"")
+            except httpx.HTTPError as exc:
+                raise requests.exceptions.ConnectionError(exc)
+            if not chunk:
+                break
+            self._buffer += chunk
+        if amt is None:
+            data, self._buffer = self._buffer, b""
+        else:
+            data, self._buffer = self._buffer[:amt], self._buffer[amt:]
+        return data
+
+    def close(self) -> None:
+        self._response.close()
+
+    def release_conn(self) -> None:
+        self._response.close()
+
+
+class Http2Adapter(BaseAdapter):
+    """requests transport adapter backed by an httpx client with HTTP/2 enabled.
+
+    Servers that offer h2 over ALPN get one multiplexed connection per host; the rest
+    fall back to pooled HTTP/1.1 keep-alive connections. Redirects, cookies and headers
+    are still handled by the requests session.
+    """
+
+    def __init__(self, max_retries: int = 0, pool_hosts: int = 256, pool_per_host: int = 2) -> None:
+        super().__init__()
+        limits = httpx.Limits(
+            max_connections=pool_hosts * pool_per_host,
+            max_keepalive_connections=pool_hosts,
+            keepalive_expiry=60,
+        )
+        transport = httpx.HTTPTransport(http2=True, limits=limits, retries=max_retries)
+        self.client = httpx.Client(transport=transport, follow_redirects=False)
+
+    def send(
+        self,
+        request: PreparedRequest,
+        stream: bool = False,
+        timeout=None,
+        verify=True,
+        cert=None,
+        proxies=None,
+    ) -> Response:
+        if isinstance(timeout, tuple):
+            connect, read = timeout
+            timeout = httpx.Timeout(read, connect=connect)
+        elif timeout is not None:
+            timeout = httpx.Timeout(timeout)
+        headers = {k: v for k, v in request.headers.items() if k.lower() not in HOP_BY_HOP_HEADERS}
+        req = self.client.build_request(
+            request.method, request.url, headers=headers, content=request.body, timeout=timeout
+        )
+        try:
+            resp = self.client.send(req, stream=True)
+        except httpx.ConnectTimeout as exc:
+            raise requests.exceptions.ConnectTimeout(exc, request=request)
+        except httpx.TimeoutException as exc:
+            raise requests.exceptions.ReadTimeout(exc, request=request)
+        except httpx.ConnectError as exc:
+            if "SSL" in str(exc) or "CERTIFICATE" in str(exc).upper():
+                raise requests.exceptions.SSLError(exc, request=request)
+            raise requests.exceptions.ConnectionError(exc, request=request)
+        except httpx.HTTPError as exc:
+            raise requests.exceptions.ConnectionError(exc, request=request)
+
+        response = Response()
+        response.status_code = resp.status_code
+        response.headers = CaseInsensitiveDict(resp.headers.items())
+        response.encoding = get_encoding_from_headers(response.headers)
+        response.raw = _HttpxRaw(resp)
+        response.reason = resp.reason_phrase
+        response.url = request.url
+        response.request = request
+        response.connection = self
+        return response
+
+    def close(self) -> None:
+        self.client.close()
@@ -1,18 +1,43 @@
 from __future__ import annotations
 
 import logging
-import subprocess
+import re
+import ssl
+import threading
 import time
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass
-from typing import Optional
+from pathlib import Path
+from typing import Iterable, Optional
 from urllib.parse import urlparse
 from urllib.robotparser import RobotFileParser
 
 import requests
 from requests import Response, Session
 from requests.adapters import HTTPAdapter
+from urllib3.exceptions import ReadTimeoutError
 from urllib3.util.retry import Retry
 
+from utils.crawl_archive import ArchiveMissError, CrawlArchive
+from utils.crawl_metrics import (
+    TIMED_POOL_CLASSES,
+    CrawlMetrics,
+    RequestRecord,
+    add_rate_limit_wait,
+    take_connect_seconds,
+    take_rate_limit_wait,
+)
+from utils.dns_cache import HostResolver, url_hostname
+from utils.host_latency import LatencyTracker
+from utils.host_state import HostCircuitBreaker, HostStateStore, MissingPathMemory
+from utils.http2_adapter import Http2Adapter, http2_available
+from utils.response_cache import CacheMissError, ResponseCache
+from utils.robots_cache import RobotsEntry, RobotsStore
+
+# Failures that count towards opening a host's circuit.
+HOST_FAILURE_ERRORS = (requests.exceptions.ConnectionError, requests.exceptions.Timeout)
+MAX_AGE_RE = re.compile(r"max-age\s*=\s*(\d+)", re.IGNORECASE)
+
 
 @dataclass
 class HttpConfig:
@@ -21,17 +46,224 @@ class HttpConfig:
     timeout_seconds: int = 30
     max_retries: int = 3
     backoff_factor: float = 1.5
+    # Requests a single host may make back-to-back before the per-host delay applies.
+    host_burst: int = 1
+    # Directory for persistent crawl stores (response cache etc.); None keeps everything in memory.
+    cache_dir: Optional[str] = None
+    # Serve only previously cached responses and never touch the network.
+    cache_only: bool = False
+    # Answer every request from the crawl archive under cache_dir instead of the network.
+    replay: bool = False
+    # Replay the latest archived response on or before this date (YYYY-MM-DD).
+    replay_as_of: Optional[str] = None
+    # robots.txt rules are reused for this long (capped by the response's own max-age).
+    robots_ttl_seconds: int = 86400
+    # Failed robots fetches are retried sooner; until then the host stays disallowed.
+    robots_failure_ttl_seconds: int = 3600
+    # Consecutive connect errors, timeouts or 5xx responses before a host fails fast.
+    circuit_failure_threshold: int = 3
+    # How long a host whose circuit opened stays "known dead" for later runs.
+    dead_host_ttl_seconds: int = 7 * 86400
+    # Fail fast for hosts that were known dead in earlier runs instead of only deprioritising them.
+    skip_dead_hosts: bool = False
+    # get_page() stops reading after this many (decoded) bytes.
+    max_page_bytes: int = 2_000_000
+    # get_page() only downloads bodies with these Content-Type values (or none declared).
+    page_content_types: tuple[str, ...] = ("text/html", "application/xhtml+xml", "text/plain")
+    # Derive each host's read timeout from its observed latency (or its host family's),
+    # between min_timeout_seconds and timeout_seconds, instead of always using timeout_seconds.
+    adaptive_timeouts: bool = False
+    min_timeout_seconds: float = 3.0
+    # Adaptive read timeout = timeout_multiplier x this latency percentile.
+    timeout_percentile: float = 0.95
+    timeout_multiplier: float = 3.0
+    # With adaptive timeouts, hosts that do not accept a connection within this fail fast.
+    connect_timeout_seconds: float = 5.0
+    # Per-request timing/byte records (JSON lines) and an optional Prometheus textfile with totals.
+    metrics_jsonl: Optional[str] = None
+    metrics_prometheus: Optional[str] = None
+    # Keep-alive pools: hosts that keep idle connections open, and connections kept per host.
+    pool_hosts: int = 256
+    pool_per_host: int = 2
+    # Negotiate HTTP/2 over TLS when the optional httpx and h2 packages are installed. Off by
+    # default: that transport does not retry 429/5xx responses or honour verify and proxies.
+    http2: bool = False
+
+
+def host_key(url: str) -> str:
+    host = (urlparse(url).hostname or "").lower()
+    if host.startswith("www."):
+        host = host[4:]
+    return host
+
+
+def canonical_url(url: str) -> str:
+    """Identity of a page for de-duplication: scheme, ``www.``, trailing slash and fragment ignored."""
+    parsed = urlparse(url.strip())
+    path = parsed.path.rstrip("/")
+    return f"{host_key(url)}{path}" + (f"?{parsed.query}" if parsed.query else "")
+
+
+def is_read_timeout(exc: BaseException) -> bool:
+    """ReadTimeout, including one urllib3 reports as exhausted retries (a ConnectionError)."""
+    if isinstance(exc, requests.exceptions.ReadTimeout):
+        return True
+    reason = getattr(exc.args[0], "reason", None) if exc.args else None
+    return isinstance(reason, ReadTimeoutError)
+
+
+def robots_base(url: str) -> str:
+    parsed = urlparse(url)
+    return f"{parsed.scheme}://{parsed.netloc}"
+
+
+def cache_max_age(cache_control: str | None) -> int | None:
+    match = MAX_AGE_RE.search(cache_control or "")
+    return int(match.group(1)) if match else None
+
+
+class HostUnavailableError(requests.exceptions.ConnectionError):
+    """Raised without touching the network once a host's circuit is open."""
+
+
+class UnsupportedContentError(requests.exceptions.RequestException):
+    """Raised when a capped fetch is not one of the allowed content types."""
+
+
+def read_capped_body(
+    response: Response,
+    max_bytes: Optional[int] = None,
+    content_types: Optional[tuple[str, ...]] = None,
+    chunk_size: int = 64 * 1024,
+) -> Response:
+    """Read a ``stream=True`` response into memory, stopping early where possible."""
+    try:
+        content_type = (response.headers.get("Content-Type") or "").split(";", 1)[0].strip().lower()
+        if content_types and content_type and content_type not in content_types:
+            raise UnsupportedContentError(f"Skipped {content_type} body: {response.url}", response=response)
+
+        chunks = []
+        size = 0
+        truncated = False
+        for chunk in response.iter_content(chunk_size=chunk_size):
+            chunks.append(chunk)
+            size += len(chunk)
+            if max_bytes is not None and size >= max_bytes:
+                truncated = True
+                break
+        body = b"".join(chunks)
+        response._content = body[:max_bytes] if max_bytes is not None else body
+        response.truncated = truncated
+        return response
+    finally:
+        response.close()
+
+
+class HostRateLimiter:
+    """Token bucket per host: each host refills one token every ``interval`` seconds.
+
+    ``reserve`` claims a slot and returns how long the caller must wait before
+    sending, so different hosts never wait on each other.
+    """
+
+    def __init__(self, interval: float, burst: int = 1) -> None:
+        self.interval = max(0.0, float(interval))
+        self.burst = max(1, int(burst))
+        self._buckets: dict[str, tuple[float, float]] = {}
+        self._lock = threading.Lock()
+
+    def _tokens(self, host: str, now: float) -> float:
+        tokens, updated = self._buckets.get(host, (float(self.burst), now))
+        if self.interval <= 0:
+            return float(self.burst)
+        return min(float(self.burst), tokens + (now - updated) / self.interval)
+
+    def reserve(self, host: str) -> float:
+        with self._lock:
+            now = time.monotonic()
+            tokens = self._tokens(host, now) - 1.0
+            self._buckets[host] = (tokens, now)
+        return 0.0 if tokens >= 0 else -tokens * self.interval
+
+    def ready_in(self, host: str) -> float:
+        with self._lock:
+            tokens = self._tokens(host, time.monotonic())
+        return 0.0 if tokens >= 1 else (1.0 - tokens) * self.interval
+
+
+def legacy_ssl_context() -> ssl.SSLContext:
+    # Certificates are still verified; only protocol/cipher negotiation is relaxed
+    # for school servers whose TLS setup modern defaults refuse.
+    context = ssl.create_default_context()
+    context.set_ciphers("DEFAULT:@SECLEVEL=1")
+    try:
+        context.minimum_version = ssl.TLSVersion.TLSv1
+    except (ValueError, ssl.SSLError):
+        pass
+    context.options |= getattr(ssl, "OP_LEGACY_SERVER_CONNECT", 0)
+    return context
+
+
+class TimedHTTPAdapter(HTTPAdapter):
+    """HTTPAdapter whose connections report how long they took to connect (see crawl_metrics)."""
+
+    def init_poolmanager(self, *args, **kwargs) -> None:
+        super().init_poolmanager(*args, **kwargs)
+        self.poolmanager.pool_classes_by_scheme = TIMED_POOL_CLASSES
+
+
+class LegacyTlsAdapter(TimedHTTPAdapter):
+    def __init__(self, *args, **kwargs) -> None:
+        self.ssl_context = legacy_ssl_context()
+        super().__init__(*args, **kwargs)
+
+    def init_poolmanager(self, *args, **kwargs) -> None:
+        kwargs["ssl_context"] = self.ssl_context
+        super().init_poolmanager(*args, **kwargs)
+
+    def proxy_manager_for(self, proxy, **proxy_kwargs):
+        proxy_kwargs["ssl_context"] = self.ssl_context
+        return super().proxy_manager_for(proxy, **proxy_kwargs)
 
 
 class EthicalHttpClient:
     def __init__(self, config: HttpConfig, scrape_logger: Optional[logging.Logger] = None) -> None:
         self.config = config
         self.scrape_logger = scrape_logger
-        self.session = self._build_session()
-        self._last_request_ts = 0.0
+        self.session = self._build_session(http2=config.http2)
+        # Pooled fallback for hosts whose TLS handshake fails with the default context.
+        self.legacy_tls_session = self._build_session(LegacyTlsAdapter)
+        self.rate_limiter = HostRateLimiter(config.request_delay_seconds, config.host_burst)
         self._robots_cache: dict[str, RobotFileParser] = {}
+        self.response_cache = (
+            ResponseCache(Path(config.cache_dir) / "http_responses.sqlite") if config.cache_dir else None
+        )
+        self.robots_store = RobotsStore(Path(config.cache_dir) / "robots.sqlite") if config.cache_dir else None
+        # Every network response is also appended to a WARC-style archive for offline replay
+        # (unchanged responses only once).
+        self.archive = CrawlArchive(Path(config.cache_dir) / "archive") if config.cache_dir else None
+        self.host_state = HostStateStore(Path(config.cache_dir) / "hosts.sqlite") if config.cache_dir else None
+        self._legacy_tls_hosts: set[str] = set(self.host_state.items("tls")) if self.host_state else set()
+        self.circuit_breaker = HostCircuitBreaker(
+            threshold=config.circuit_failure_threshold,
+            store=self.host_state,
+            dead_host_ttl_seconds=config.dead_host_ttl_seconds,
+            skip_known_dead=config.skip_dead_hosts,
+        )
+        # DNS answers from earlier pre-resolution passes (29_prewarm_crawl.py).
+        self.resolver = HostResolver(self.host_state)
+        self.path_memory = MissingPathMemory(self.host_state)
+        self.latency = LatencyTracker()
+        # Requests sent over the network (robots.txt included); crawl budgets count these.
+        self.request_count = 0
+        self._count_lock = threading.Lock()
+        self.metrics = (
+            CrawlMetrics(config.metrics_jsonl, config.metrics_prometheus)
+            if config.metrics_jsonl or config.metrics_prometheus
+            else None
+        )
 
-    def _build_session(self) -> Session:
+    def _build_session(self, adapter_cls: type[HTTPAdapter] = TimedHTTPAdapter, http2: bool = False) -> Session:
         session = requests.Session()
         retry = Retry(
             total=self.config.max_retries,
@@ -42,92 +274,349 @@ class EthicalHttpClient:
             allowed_methods=("GET", "HEAD"),
             raise_on_status=False,
         )
-        adapter = HTTPAdapter(max_retries=retry)
+        adapter = adapter_cls(
+            max_retries=retry,
+            pool_connections=self.config.pool_hosts,
+            pool_maxsize=self.config.pool_per_host,
+        )
         session.mount("http://", adapter)
         session.mount("https://", adapter)
+        if http2 and http2_available():
+            # h2 is only offered over TLS (ALPN); plain http stays on the urllib3 pool.
+            session.mount(
+                "https://",
+                Http2Adapter(self.config.max_retries, self.config.pool_hosts, self.config.pool_per_host),
+            )
         session.headers.update({"User-Agent": self.config.user_agent})
         return session
 
-    def _rate_limit(self) -> None:
-        elapsed = time.time() - self._last_request_ts
-        delay = self.config.request_delay_seconds
-        if elapsed < delay:
-            time.sleep(delay - elapsed)
+    def _check_circuit(self, url: str) -> None:
+        host = host_key(url)
+        if not self.circuit_breaker.allow(host):
+            raise HostUnavailableError(f"Circuit open for {host}: {url}")
+
+    def _session_request(self, method: str, url: str, **kwargs) -> Response:
+        host = host_key(url)
+        self._check_circuit(url)
+        self._check_resolvable(url)
+        adaptive = self.config.adaptive_timeouts and "timeout" not in kwargs
+        kwargs.setdefault("timeout", self._timeout_for(host))
+        connect, read = kwargs["timeout"] if adaptive else (None, None)
+        # A read timeout only gets a retry, and is kept off the breaker, below the ceiling.
+        retry_timeout = adaptive and read < self.config.timeout_seconds
+        try:
+            response, started = self._send(host, method, url, count_timeouts=not retry_timeout, **kwargs)
+        except Exception as exc:
+            if not retry_timeout or not is_read_timeout(exc):
+                raise
+            # The host is slower than its (or its family's) history suggested, not down: remember
+            # that for later timeouts and give this request one more try with the full ceiling.
+            self.latency.record_timeout(host, read)
+            kwargs["timeout"] = (connect, float(self.config.timeout_seconds))
+            response, started = self._send(host, method, url, count_timeouts=True, **kwargs)
+        response.request_started = started
+        # Some servers answer HEAD with 501; that says nothing about the host's health.
+        if response.status_code >= 500 and not (method == "HEAD" and response.status_code == 501):
+            self.circuit_breaker.record_failure(host)
+        else:
+            self.circuit_breaker.record_success(host)
+            self.latency.record(host, response.elapsed.total_seconds())
+        if not kwargs.get("stream"):
+            self._record_request(method, url, started, response)
+        return response
+
+    def _send(self, host: str, method: str, url: str, count_timeouts: bool, **kwargs) -> tuple[Response, float]:
+        take_connect_seconds()
+        with self._count_lock:
+            self.request_count += 1
+        started = time.monotonic()
+        try:
+            return self._transport_request(host, method, url, **kwargs), started
+        except Exception as exc:
+            # Adaptive read timeouts are retried by the caller and say nothing about the host's health.
+            if isinstance(exc, HOST_FAILURE_ERRORS) and (count_timeouts or not is_read_timeout(exc)):
+                self.circuit_breaker.record_failure(host)
+            self._record_request(method, url, started, error=exc)
+            raise
+
+    def _record_request(
+        self,
+        method: str,
+        url: str,
+        started: Optional[float],
+        response: Optional[Response] = None,
+        error: Optional[BaseException] = None,
+        robots_blocked: bool = False,
+    ) -> None:
+        if self.metrics is None:
+            return
+        retries = getattr(getattr(response, "raw", None), "retries", None)
+        content = response._content if response is not None else None
+        self.metrics.record(
+            RequestRecord(
+                ts=time.time(),
+                method=method,
+                host=host_key(url),
+                url=url,
+                status=int(response.status_code) if response is not None else None,
+                connect_s=take_connect_seconds(),
+                ttfb_s=response.elapsed.total_seconds() if response is not None else 0.0,
+                total_s=time.monotonic() - started if started is not None else 0.0,
+                bytes=len(content) if isinstance(content, bytes) else 0,
+                retries=len(retries.history) if retries is not None else 0,
+                robots_blocked=robots_blocked,
+                rate_limit_sleep_s=take_rate_limit_wait(),
+                error=type(error).__name__ if error is not None else None,
+            )
+        )
+
+    def _timeout_for(self, host: str) -> float | tuple[float, float]:
+        if not self.config.adaptive_timeouts:
+            return self.config.timeout_seconds
+        ceiling = float(self.config.timeout_seconds)
+        latency = self.latency.percentile(host, self.config.timeout_percentile)
+        read = ceiling if latency is None else latency * self.config.timeout_multiplier
+        read = min(ceiling, max(self.config.min_timeout_seconds, read))
+        return min(self.config.connect_timeout_seconds, read), read
+
+    def _check_resolvable(self, url: str) -> None:
+        hostname = url_hostname(url)
+        if hostname and self.resolver.is_dead(hostname):
+            raise HostUnavailableError(f"Host does not resolve (NXDOMAIN): {url}")
+
+    def _transport_request(self, host: str, method: str, url: str, **kwargs) -> Response:
+        if host in self._legacy_tls_hosts:
+            return self.legacy_tls_session.request(method, url, **kwargs)
+        try:
+            return self.session.request(method, url, **kwargs)
+        except requests.exceptions.SSLError:
+            response = self.legacy_tls_session.request(method, url, **kwargs)
+            # Remember the working transport so later requests skip the failing handshake.
+            self._legacy_tls_hosts.add(host)
+            if self.host_state:
+                self.host_state.set(host, "tls", "legacy")
+            return response
+
+    def _rate_limit(self, url: str) -> None:
+        delay = self.rate_limiter.reserve(host_key(url))
+        if delay > 0:
+            time.sleep(delay)
+            add_rate_limit_wait(delay)
 
     def _get_robot_parser(self, url: str) -> RobotFileParser:
-        parsed = urlparse(url)
-        base = f"{parsed.scheme}://{parsed.netloc}"
-        if base in self._robots_cache:
-            return self._robots_cache[base]
+        base = robots_base(url)
+        parser = self._robots_cache.get(base)
+        if parser is not None:
+            return parser
+
+        entry = self.robots_store.lookup(base) if self.robots_store else None
+        if self.config.cache_only or self.config.replay:
+            entry = self._offline_robots_entry(base, entry)
+        elif entry is None or not entry.fresh:
+            entry = self._fetch_robots_entry(base)
+        parser = entry.parser()
+        self._robots_cache[base] = parser
+        return parser
+
+    def _offline_robots_entry(self, base: str, stored: Optional[RobotsEntry]) -> RobotsEntry:
+        """robots.txt for offline runs: the archived copy (replay) or the stored rules, never fetched or saved."""
+        now = time.time()
+        if self.config.replay and self.archive is not None:
+            robots_urls = [f"{base}/robots.txt"]
+            if base.startswith("https://"):
+                robots_urls.append("http://" + robots_urls[0][len("https://"):])
+            for robots_url in robots_urls:
+                archived = self.archive.lookup(robots_url, as_of=self.config.replay_as_of)
+                if archived is None or (archived.status_code >= 400 and archived.status_code != 404):
+                    continue
+                rules = archived.text if archived.status_code < 400 else "User-agent: *\nDisallow:"
+                return RobotsEntry(base=base, status=archived.status_code, rules=rules, fetched_at=now, expires_at=now)
+        if stored is not None:
+            return stored
+        # Nothing known: no rules and no sitemaps. Offline requests never consult the rules.
+        return RobotsEntry(base=base, status=None, rules="", fetched_at=now, expires_at=now)
 
+    def _fetch_robots_entry(self, base: str) -> RobotsEntry:
         robots_url = f"{base}/robots.txt"
-        parser = RobotFileParser()
-        parser.set_url(robots_url)
+        status_code = None
+        ttl = self.config.robots_ttl_seconds
         try:
-            status_code, robots_text = self._fetch_robots_text(robots_url)
-            if (not robots_text and status_code != 404) and parsed.scheme == "https":
+            status_code, robots_text, max_age = self._fetch_robots_text(robots_url)
+            if (not robots_text and status_code != 404) and base.startswith("https://"):
                 # Fallback for environments with older TLS stacks.
-                http_robots_url = f"http://{parsed.netloc}/robots.txt"
-                status_code, robots_text = self._fetch_robots_text(http_robots_url)
+                http_robots_url = "http://" + robots_url[len("https://"):]
+                status_code, robots_text, max_age = self._fetch_robots_text(http_robots_url)
 
             if robots_text:
-                parser.parse(robots_text.splitlines())
+                rules = robots_text
             elif status_code == 404:
                 # No robots.txt published: treat as crawl-allowed.
-                parser.parse(["User-agent: *", "Disallow:"])
+                rules = "User-agent: *\nDisallow:"
             else:
                 raise RuntimeError("robots fetch failed")
+            if max_age is not None:
+                ttl = min(ttl, max_age)
+        except HostUnavailableError:
+            # A dead host is not a robots.txt failure; nothing is stored and it stays dead.
+            raise
         except Exception:
             # Fail closed: if robots cannot be read, disallow crawling for safety.
-            parser = RobotFileParser()
-            parser.parse(["User-agent: *", "Disallow: /"])
+            rules = "User-agent: *\nDisallow: /"
+            ttl = self.config.robots_failure_ttl_seconds
 
-        self._robots_cache[base] = parser
-        return parser
+        if self.robots_store:
+            return self.robots_store.store(base, status_code, rules, ttl)
+        now = time.time()
+        return RobotsEntry(base=base, status=status_code, rules=rules, fetched_at=now, expires_at=now + ttl)
 
-    def _fetch_robots_text(self, robots_url: str) -> tuple[int | None, str]:
+    def _fetch_robots_text(self, robots_url: str) -> tuple[int | None, str, int | None]:
         try:
-            self._rate_limit()
-            response = self.session.get(robots_url, timeout=self.config.timeout_seconds)
-            self._last_request_ts = time.time()
+            self._rate_limit(robots_url)
+            response = self._session_request("GET", robots_url)
+            if self.archive is not None:
+                # Archived so replays see the same rules and Sitemap: lines.
+                self.archive.record(robots_url, response)
+            max_age = cache_max_age(response.headers.get("Cache-Control"))
             if response.status_code >= 400:
-                return int(response.status_code), ""
-            return int(response.status_code), response.text or ""
-        except requests.exceptions.SSLError:
-            # Local TLS compatibility fallback using curl.
-            cmd = [
-                "curl",
-                "-L",
-                "-sS",
-                "--max-time",
-                str(int(self.config.timeout_seconds)),
-                "-A",
-                self.config.user_agent,
-                robots_url,
-            ]
-            result = subprocess.run(cmd, capture_output=True, text=True, check=False)
-            self._last_request_ts = time.time()
-            if result.returncode != 0:
-                return None, ""
-            text = result.stdout or ""
-            if "<title>404" in text.lower():
-                return 404, ""
-            return 200, text
+                return int(response.status_code), "", max_age
+            return int(response.status_code), response.text or "", max_age
+        except HostUnavailableError:
+            raise
         except Exception:
-            return None, ""
+            return None, "", None
+
+    def prewarm_robots(self, urls: Iterable[str], max_workers: int = 32) -> int:
+        """Fetch robots.txt for every distinct host in ``urls`` that has no fresh stored copy."""
+        stale = []
+        for base in dict.fromkeys(robots_base(u) for u in urls if u):
+            if base in self._robots_cache:
+                continue
+            entry = self.robots_store.lookup(base) if self.robots_store else None
+            if entry is None or not entry.fresh:
+                stale.append(base)
+        def fetch(base: str) -> None:
+            try:
+                self._get_robot_parser(base)
+            except HostUnavailableError:
+                pass
+
+        # Each base is a different host, so the per-host rate limiter lets these overlap.
+        with ThreadPoolExecutor(max_workers=max(1, max_workers)) as pool:
+            list(pool.map(fetch, stale))
+        return len(stale)
+
+    def is_known_dead(self, url: str) -> bool:
+        hostname = url_hostname(url)
+        return self.circuit_breaker.is_known_dead(host_key(url)) or bool(
+            hostname and self.resolver.is_dead(hostname)
+        )
+
+    def sitemap_urls(self, url: str) -> list[str]:
+        """Sitemap locations declared in the host's robots.txt."""
+        return list(self._get_robot_parser(url).site_maps() or [])
 
     def is_allowed(self, url: str) -> bool:
         parser = self._get_robot_parser(url)
         return parser.can_fetch(self.config.user_agent, url)
 
-    def get(self, url: str, **kwargs) -> Response:
+    def get(
+        self,
+        url: str,
+        *,
+        max_bytes: Optional[int] = None,
+        content_types: Optional[tuple[str, ...]] = None,
+        **kwargs,
+    ) -> Response:
+        if self.config.replay:
+            archived = self.archive.lookup(url, as_of=self.config.replay_as_of) if self.archive else None
+            if archived is None:
+                raise ArchiveMissError(f"Not in crawl archive: {url}")
+            if content_types and archived.headers.get("Content-Type"):
+                content_type = archived.headers["Content-Type"].split(";", 1)[0].strip().lower()
+                if content_type not in content_types:
+                    raise UnsupportedContentError(f"Skipped {content_type} body: {url}", response=archived)
+            return archived
+
+        streamed = bool(kwargs.get("stream"))
+        cache = self.response_cache if not streamed else None
+        cached = cache.lookup(url) if cache else None
+        if self.config.cache_only:
+            if cached is None:
+                raise CacheMissError(f"Not in response cache: {url}")
+            return cached.to_response()
+
+        # An open circuit fails fast: no robots.txt lookup and no politeness delay.
+        self._check_circuit(url)
+        self._check_resolvable(url)
         if not self.is_allowed(url):
+            self._record_request("GET", url, None, robots_blocked=True)
             raise PermissionError(f"Blocked by robots.txt: {url}")
 
-        self._rate_limit()
+        self._rate_limit(url)
         if self.scrape_logger:
             self.scrape_logger.info(url)
 
-        response = self.session.get(url, timeout=self.config.timeout_seconds, **kwargs)
-        self._last_request_ts = time.time()
+        if cached is not None:
+            kwargs["headers"] = {**cached.conditional_headers(), **(kwargs.get("headers") or {})}
+        capped = max_bytes is not None or content_types is not None
+        if capped:
+            kwargs["stream"] = True
+        response = wire = self._session_request("GET", url, **kwargs)
+        try:
+            if cached is not None and response.status_code == 304:
+                response.close()
+                cache.touch(url)
+                response = cached.to_response()
+            else:
+                if capped:
+                    read_capped_body(response, max_bytes, content_types)
+                if cache is not None and response.status_code == 200:
+                    cache.store(url, response)
+        finally:
+            if capped:
+                # Streamed bodies are only complete here, so they are recorded here rather than on send.
+                self._record_request("GET", url, wire.request_started, wire)
+        if self.archive is not None and not streamed:
+            self.archive.record(url, response)
         return response
+
+    def head(self, url: str, **kwargs) -> Response:
+        """HEAD request for existence checks; robots.txt and the per-host delay apply, nothing is cached."""
+        if self.config.cache_only or self.config.replay:
+            raise CacheMissError(f"HEAD needs the network: {url}")
+        self._check_circuit(url)
+        self._check_resolvable(url)
+        if not self.is_allowed(url):
+            self._record_request("HEAD", url, None, robots_blocked=True)
+            raise PermissionError(f"Blocked by robots.txt: {url}")
+
+        self._rate_limit(url)
+        if self.scrape_logger:
+            self.scrape_logger.info("HEAD %s", url)
+        kwargs.setdefault("allow_redirects", True)
+        return self._session_request("HEAD", url, **kwargs)
+
+    def get_page(self, url: str, **kwargs) -> Response:
+        """GET a web page, refusing non-page content types and truncating oversized bodies."""
+        return self.get(
+            url,
+            max_bytes=self.config.max_page_bytes,
+            content_types=self.config.page_content_types,
+            **kwargs,
+        )
+
+    def close(self) -> None:
+        """Close connections and stores, and write the final metrics."""
+        self.session.close()
+        self.legacy_tls_session.close()
+        if self.metrics is not None:
+            self.metrics.close()
+        for store in (self.response_cache, self.robots_store, self.archive, self.host_state):
+            if store is not None:
+                store.close()
+
+    def __enter__(self) -> "EthicalHttpClient":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
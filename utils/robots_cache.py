@@ -0,0 +1,82 @@
+from __future__ import annotations
+
+import sqlite3
+import threading
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Optional
+from urllib.robotparser import RobotFileParser
+
+
+@dataclass
+class RobotsEntry:
+    base: str
+    status: Optional[int]
+    rules: str
+    fetched_at: float
+    expires_at: float
+
+    @property
+    def fresh(self) -> bool:
+        return time.time() < self.expires_at
+
+    def parser(self) -> RobotFileParser:
+        parser = RobotFileParser()
+        parser.set_url(f"{self.base}/robots.txt")
+        parser.parse(self.rules.splitlines())
+        return parser
+
+
+class RobotsStore:
+    """robots.txt rules per scheme+host, shared by every script through one SQLite file."""
+
+    def __init__(self, path: str | Path) -> None:
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(self.path, check_same_thread=False)
+        self._lock = threading.Lock()
+        with self._lock:
+            self._conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS robots (
+                    base TEXT PRIMARY KEY,
+                    status INTEGER,
+                    rules TEXT NOT NULL,
+                    fetched_at REAL NOT NULL,
+                    expires_at REAL NOT NULL
+                )
+                """
+            )
+            self._conn.commit()
+
+    def lookup(self, base: str) -> Optional[RobotsEntry]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT base, status, rules, fetched_at, expires_at FROM robots WHERE base = ?",
+                (base,),
+            ).fetchone()
+        if not row:
+            return None
+        return RobotsEntry(
+            base=row[0],
+            status=row[1],
+            rules=row[2],
+            fetched_at=float(row[3]),
+            expires_at=float(row[4]),
+        )
+
+    def store(self, base: str, status: Optional[int], rules: str, ttl_seconds: float) -> RobotsEntry:
+        now = time.time()
+        entry = RobotsEntry(base=base, status=status, rules=rules, fetched_at=now, expires_at=now + ttl_seconds)
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO robots VALUES (?, ?, ?, ?, ?)",
+                (entry.base, entry.status, entry.rules, entry.fetched_at, entry.expires_at),
+            )
+            self._conn.commit()
+        return entry
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
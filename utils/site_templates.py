@@ -0,0 +1,125 @@
+"""School-site templates whose contact details can be read without a generic page scan.
+
+Each template recognises its schools from the URL, knows where a school's contact details
+live, and reads them straight from that response body once the body carries the template's
+own markers (a redesigned or look-alike site does not). Enrichment tries these before
+fetching a homepage and falls back to the generic heuristics when a template finds nothing.
+"""
+from __future__ import annotations
+
+import html as html_lib
+import json
+import re
+from dataclasses import dataclass
+from typing import Callable, Optional
+from urllib.parse import parse_qs, quote, urlparse
+
+from utils.extractors import choose_general_email
+
+MAILTO_HREF_RE = re.compile(r"""href\s*=\s*(["'])\s*mailto:(.*?)\1""", re.IGNORECASE | re.DOTALL)
+# Stylesheets, scripts and images served from the Schools Online application itself.
+SCHOOLSONLINE_ASSET_RE = re.compile(
+    r"""(?:src|href)\s*=\s*["'][^"']*/schoolsonline/[^"']*\.(?:css|js|gif|png)\b""", re.IGNORECASE
+)
+NT_DIRECTORY_HOST = "directory.ntschools.net"
+NT_DIRECTORY_SCHOOL_API = f"https://{NT_DIRECTORY_HOST}/api/System/GetSchool?itSchoolCode={{code}}"
+
+TemplateDetails = tuple[Optional[str], Optional[str]]
+
+
+@dataclass(frozen=True)
+class SiteTemplate:
+    name: str
+    # URL of the school's contact details, or None when the school URL is not on this template.
+    contact_url: Callable[[str], Optional[str]]
+    # (email, contact form URL) from the contact URL's body and that URL.
+    extract: Callable[[str, str], TemplateDetails]
+    # Whether the contact URL's body really is this template's page.
+    fingerprint: Callable[[str], bool]
+    # The contact URL is an HTML page: when extract finds no email, read it like any other page.
+    analyse_page: bool = False
+
+
+def _url_param(url: str, name: str) -> Optional[str]:
+    """Case-insensitive query parameter, also looked up in a ``#/path?query`` fragment."""
+    parsed = urlparse(url)
+    for query in (parsed.query, parsed.fragment.partition("?")[2]):
+        for key, values in parse_qs(query).items():
+            if key.lower() == name and values and values[0].strip():
+                return values[0].strip()
+    return None
+
+
+def _mailto_emails(body: str) -> list[str]:
+    emails = []
+    for _, href in MAILTO_HREF_RE.findall(body):
+        address = html_lib.unescape(href).split("?", 1)[0]
+        emails.extend(part.strip() for part in re.split(r"[;,]", address) if part.strip())
+    return emails
+
+
+def schoolsonline_contact_url(url: str) -> Optional[str]:
+    parsed = urlparse(url)
+    if "det.wa.edu.au" not in parsed.netloc.lower() or "schoolsonline" not in parsed.path.lower():
+        return None
+    school_id = _url_param(url, "schoolid")
+    if not school_id or not school_id.isdigit():
+        return None
+    return f"{parsed.scheme or 'https'}://{parsed.netloc}/schoolsonline/contact.do?schoolID={school_id}"
+
+
+def is_schoolsonline_page(body: str) -> bool:
+    return SCHOOLSONLINE_ASSET_RE.search(body) is not None
+
+
+def extract_schoolsonline_contact(body: str, url: str) -> TemplateDetails:
+    # contact.do usually lists the school's address as a mailto link; other layouts are left
+    # to the generic page analysis.
+    return choose_general_email(_mailto_emails(body), website_url=url, source="mailto"), None
+
+
+def nt_directory_contact_url(url: str) -> Optional[str]:
+    if urlparse(url).netloc.lower() != NT_DIRECTORY_HOST:
+        return None
+    code = _url_param(url, "itschoolcode")
+    return NT_DIRECTORY_SCHOOL_API.format(code=quote(code)) if code else None
+
+
+def is_nt_directory_record(body: str) -> bool:
+    try:
+        details = json.loads(body)
+    except ValueError:
+        return False
+    return isinstance(details, dict) and "itSchoolCode" in details
+
+
+def extract_nt_directory_contact(body: str, url: str) -> TemplateDetails:
+    # The directory pages are a script shell; the school's record comes from its JSON API.
+    try:
+        details = json.loads(body)
+    except ValueError:
+        return None, None
+    if not isinstance(details, dict):
+        return None, None
+    return choose_general_email([str(details.get("mail") or "").strip()], source="directory"), None
+
+
+SITE_TEMPLATES = (
+    SiteTemplate(
+        "schoolsonline",
+        schoolsonline_contact_url,
+        extract_schoolsonline_contact,
+        is_schoolsonline_page,
+        analyse_page=True,
+    ),
+    SiteTemplate("nt_directory", nt_directory_contact_url, extract_nt_directory_contact, is_nt_directory_record),
+)
+
+
+def match_site_template(url: str) -> Optional[tuple[SiteTemplate, str]]:
+    """The template ``url`` is on and the school's contact URL there, if any."""
+    for template in SITE_TEMPLATES:
+        contact_url = template.contact_url(url)
+        if contact_url:
+            return template, contact_url
+    return None
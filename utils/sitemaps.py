@@ -0,0 +1,120 @@
+from __future__ import annotations
+
+import gzip
+import io
+import zlib
+import xml.etree.ElementTree as ET
+from typing import Optional
+from urllib.parse import urljoin, urlparse
+
+from utils.http_client import EthicalHttpClient, HostUnavailableError, host_key
+
+SITEMAP_CONTENT_TYPES = (
+    "application/xml",
+    "text/xml",
+    "text/plain",
+    "application/gzip",
+    "application/x-gzip",
+    "application/octet-stream",
+)
+MAX_SITEMAP_BYTES = 5_000_000
+# Sitemap documents (robots.txt entries, /sitemap.xml, index children) fetched per host.
+MAX_SITEMAP_FETCHES = 4
+# Substrings of a URL path or title that suggest a contact page, with their weight.
+CONTACT_HINTS = (
+    ("contact", 5),
+    ("enquir", 4),
+    ("get-in-touch", 4),
+    ("office", 3),
+    ("enrol", 3),
+    ("about", 1),
+)
+# Index children unlikely to list contact pages (blog posts, products, taxonomies).
+LOW_PRIORITY_SITEMAPS = ("post", "product", "news", "event", "tag", "category", "author")
+
+SitemapEntry = tuple[str, Optional[str]]
+
+
+def contact_score(url: str, title: str | None = None) -> int:
+    text = f"{urlparse(url).path} {title or ''}".lower()
+    return sum(weight for hint, weight in CONTACT_HINTS if hint in text)
+
+
+def parse_sitemap(body: bytes) -> tuple[list[str], list[SitemapEntry]]:
+    """Child sitemap URLs and ``(loc, title)`` page entries from a sitemap or sitemap index."""
+    if body[:2] == b"\x1f\x8b":
+        try:
+            with gzip.GzipFile(fileobj=io.BytesIO(body)) as fh:
+                body = fh.read(MAX_SITEMAP_BYTES)
+        except (OSError, EOFError, zlib.error):
+            # Truncated or corrupt .xml.gz
+            return [], []
+    children: list[str] = []
+    entries: list[SitemapEntry] = []
+    try:
+        for _, elem in ET.iterparse(io.BytesIO(body), events=("end",)):
+            tag = elem.tag.rsplit("}", 1)[-1]
+            if tag not in ("url", "sitemap"):
+                continue
+            loc = title = None
+            for child in elem.iter():
+                name = child.tag.rsplit("}", 1)[-1]
+                if name == "loc" and loc is None:
+                    loc = (child.text or "").strip()
+                elif name == "title" and title is None:
+                    title = (child.text or "").strip()
+            if loc:
+                if tag == "sitemap":
+                    children.append(loc)
+                else:
+                    entries.append((loc, title))
+            elem.clear()
+    except (ET.ParseError, OSError, EOFError, zlib.error):
+        return [], []
+    return children, entries
+
+
+def rank_contact_urls(entries: list[SitemapEntry], base_url: str, limit: int = 8) -> list[str]:
+    host = host_key(base_url)
+    scored = []
+    for loc, title in entries:
+        if host_key(loc) != host:
+            continue
+        score = contact_score(loc, title)
+        if score > 0:
+            scored.append((-score, len(urlparse(loc).path), loc))
+    seen = set()
+    out = []
+    for _, _, loc in sorted(scored):
+        key = loc.lower().rstrip("/")
+        if key in seen:
+            continue
+        seen.add(key)
+        out.append(loc)
+    return out[:limit]
+
+
+def discover_contact_urls(client: EthicalHttpClient, base_url: str, limit: int = 8) -> list[str]:
+    """Contact-like pages listed in the host's sitemaps, best first (empty if none are found)."""
+    try:
+        queue = client.sitemap_urls(base_url) or [urljoin(base_url, "/sitemap.xml")]
+    except HostUnavailableError:
+        return []
+    seen: set[str] = set()
+    entries: list[SitemapEntry] = []
+    while queue and len(seen) < MAX_SITEMAP_FETCHES:
+        loc = queue.pop(0)
+        if loc in seen:
+            continue
+        seen.add(loc)
+        try:
+            resp = client.get(loc, max_bytes=MAX_SITEMAP_BYTES, content_types=SITEMAP_CONTENT_TYPES)
+        except Exception:
+            continue
+        if resp.status_code >= 400:
+            continue
+        children, page_entries = parse_sitemap(resp.content)
+        entries.extend(page_entries)
+        children.sort(key=lambda u: any(word in u.lower() for word in LOW_PRIORITY_SITEMAPS))
+        queue.extend(children)
+    return rank_contact_urls(entries, base_url, limit)